@@ -0,0 +1,49 @@
+'''Compares formatting amounts through float, like format_amount used to, with
+the exact formatting of Decimals and integer minor units.
+
+    $ python -m benchmarks.bench_amounts
+'''
+
+from decimal import Decimal
+import random
+
+from libmt94x.textutil import format_amount
+from libmt94x.textutil import format_amounts
+
+from benchmarks.common import best_of
+from benchmarks.common import print_row
+
+
+def format_amount_float(amount):
+    return (b'%.2f' % amount).replace(b'.', b',')
+
+
+def make_amounts(num_amounts, places):
+    rnd = random.Random(940)
+    scale = 10 ** places
+    return [Decimal(rnd.randint(0, 10 ** 9)) / scale for _ in xrange(num_amounts)]
+
+
+def main(num_amounts=100000):
+    print_row('amounts', 'float (s)', 'format_amount (s)', 'format_amounts (s)',
+              'minor units (s)', 'float differs')
+
+    for places in (0, 2, 3):
+        amounts = make_amounts(num_amounts, places)
+        units = [int(amount * 100) for amount in amounts]
+
+        float_time = best_of(lambda: [format_amount_float(a) for a in amounts])
+        single_time = best_of(lambda: [format_amount(a, 'nl_NL') for a in amounts])
+        batch_time = best_of(lambda: format_amounts(amounts, 'nl_NL'))
+        units_time = best_of(lambda: format_amounts(units, 'nl_NL', minor_units=True))
+
+        differs = sum(1 for a, b in zip(map(format_amount_float, amounts),
+                                        format_amounts(amounts, 'nl_NL'))
+                      if a != b)
+
+        print_row('%d places' % places, '%.3f' % float_time, '%.3f' % single_time,
+                  '%.3f' % batch_time, '%.3f' % units_time, differs)
+
+
+if __name__ == '__main__':
+    main()
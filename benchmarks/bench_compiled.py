@@ -0,0 +1,42 @@
+'''Compares writing documents with the chained serializer calls of
+Mt94xWriter against the compiled record plans of CompiledMt94xWriter, with
+and without validation.
+
+    $ python -m benchmarks.bench_compiled
+'''
+
+from libmt94x.compiled import CompiledMt94xWriter
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.serializer import TrustedMt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+from benchmarks.common import DIALECTS
+from benchmarks.common import best_of
+from benchmarks.common import make_document
+from benchmarks.common import print_row
+from benchmarks.common import write_document
+
+
+def main(num_entries=10000):
+    print_row('dialect', 'serializer', 'chained (s)', 'compiled (s)', 'speedup')
+
+    for dialect in DIALECTS:
+        doc = make_document(num_entries, dialect)
+
+        for serializer_class in (Mt94xSerializer, TrustedMt94xSerializer):
+            writer = Mt94xWriter(serializer_class())
+            compiled_writer = CompiledMt94xWriter(serializer_class())
+
+            # Both must produce the same output
+            assert (write_document(compiled_writer, doc, dialect) ==
+                    write_document(writer, doc, dialect))
+
+            chained = best_of(lambda: write_document(writer, doc, dialect))
+            compiled = best_of(lambda: write_document(compiled_writer, doc, dialect))
+
+            print_row(dialect, serializer_class.__name__, '%.3f' % chained,
+                      '%.3f' % compiled, '%.2fx' % (chained / compiled))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+'''Measures writing whole documents in every dialect at several sizes:
+throughput of write_document_*, the latency of every record yielded by
+iter_document_* and the peak memory of the process.
+
+Every case runs in a fresh process, so that the peak memory of one case does
+not carry over into the next. The entries are drawn from a pool of distinct
+entries (see make_pooled_entries), so the peak memory is that of the writer
+and not of the input.
+
+    $ python -m benchmarks.bench_documents
+    $ python -m benchmarks.bench_documents --sizes 1000,100000 --save before.json
+    $ python -m benchmarks.bench_documents --sizes 1000,100000 --compare before.json
+
+With --compare the run fails if the throughput of any case dropped by more
+than --threshold compared to the saved run.
+'''
+
+from array import array
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import timeit
+
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+from benchmarks.common import DIALECTS
+from benchmarks.common import iter_document
+from benchmarks.common import make_document
+from benchmarks.common import print_row
+from benchmarks.common import write_document
+
+
+SIZES = (1000, 100000, 1000000)
+
+POOL_SIZE = 1000
+
+
+def get_peak_memory():
+    # NOTE: ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def get_percentile(values, percentile):
+    return values[min(len(values) - 1, int(len(values) * percentile))]
+
+
+def run_case(dialect, num_entries):
+    writer = Mt94xWriter(Mt94xSerializer())
+
+    def make_doc():
+        return make_document(num_entries, dialect, lazy=True, pool_size=POOL_SIZE)
+
+    # Small documents are written a few times to smooth out the noise
+    repeat = 3 if num_entries < 100000 else 1
+
+    timings = []
+    for _ in range(repeat):
+        doc = make_doc()
+
+        start = timeit.default_timer()
+        output = write_document(writer, doc, dialect)
+        timings.append(timeit.default_timer() - start)
+
+        num_bytes = len(output)
+        del output
+
+    peak_memory = get_peak_memory()
+
+    # Time between consecutive records
+    records = iter_document(writer, make_doc(), dialect)
+    latencies = array('d')
+    last = timeit.default_timer()
+    for record in records:
+        now = timeit.default_timer()
+        latencies.append(now - last)
+        last = now
+
+    latencies = sorted(latencies)
+    elapsed = min(timings)
+
+    return {
+        'dialect': dialect,
+        'entries': num_entries,
+        'seconds': elapsed,
+        'entries_per_second': num_entries / elapsed,
+        'bytes_per_second': num_bytes / elapsed,
+        'records': len(latencies),
+        'latency_p50': get_percentile(latencies, 0.5),
+        'latency_p99': get_percentile(latencies, 0.99),
+        'latency_max': latencies[-1],
+        'peak_memory': peak_memory,
+    }
+
+
+def run_case_in_subprocess(dialect, num_entries):
+    output = subprocess.check_output([
+        sys.executable, '-m', 'benchmarks.bench_documents',
+        '--run-case', dialect, str(num_entries),
+    ])
+    return json.loads(output)
+
+
+def get_key(result):
+    return '%s/%s' % (result['dialect'], result['entries'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default=','.join(str(size) for size in SIZES),
+                        help='comma separated numbers of entries')
+    parser.add_argument('--dialects', default=','.join(DIALECTS),
+                        help='comma separated dialects')
+    parser.add_argument('--save', metavar='FILE',
+                        help='save the results as json')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare the throughput against saved results')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='the allowed relative drop in throughput')
+    parser.add_argument('--run-case', nargs=2, metavar=('DIALECT', 'ENTRIES'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        dialect, num_entries = args.run_case
+        print(json.dumps(run_case(dialect, int(num_entries))))
+        return 0
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = dict((get_key(result), result) for result in json.load(f))
+
+    print_row('dialect', 'entries', 'seconds', 'entries/s', 'MB/s',
+              'p50/p99/max (us)', 'peak memory (MB)', 'vs baseline')
+
+    results = []
+    regressions = []
+    for dialect in args.dialects.split(','):
+        for num_entries in [int(size) for size in args.sizes.split(',')]:
+            result = run_case_in_subprocess(dialect, num_entries)
+            results.append(result)
+
+            ratio = '-'
+            previous = baseline.get(get_key(result))
+            if previous:
+                change = result['entries_per_second'] / previous['entries_per_second']
+                ratio = '%.2fx' % change
+                if change < 1 - args.threshold:
+                    regressions.append(get_key(result))
+
+            print_row(
+                dialect,
+                num_entries,
+                '%.3f' % result['seconds'],
+                '%d' % result['entries_per_second'],
+                '%.1f' % (result['bytes_per_second'] / 1e6),
+                '%.0f/%.0f/%.0f' % (result['latency_p50'] * 1e6,
+                                    result['latency_p99'] * 1e6,
+                                    result['latency_max'] * 1e6),
+                '%.1f' % (result['peak_memory'] / 1e6),
+                ratio,
+            )
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if regressions:
+        print('Throughput dropped by more than %d%%: %s'
+              % (args.threshold * 100, ', '.join(regressions)))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
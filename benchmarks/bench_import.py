@@ -0,0 +1,55 @@
+'''Measures how long it takes a fresh interpreter to import the modules of
+libmt94x, and which of the slow optional dependencies get imported with them.
+
+    $ python -m benchmarks.bench_import
+'''
+
+import subprocess
+import sys
+
+from benchmarks.common import print_row
+
+
+MODULES = (
+    'libmt94x.fields',
+    'libmt94x.writer',
+    'libmt94x.parser',
+    'libmt94x.convenience',
+)
+
+# Only imported on first use
+DEFERRED_MODULES = (
+    'pycountry',
+    'unidecode',
+)
+
+SCRIPT = '''
+import sys, time
+start = time.time()
+import %s
+elapsed = time.time() - start
+print('%%f %%s' %% (elapsed, ','.join(m for m in %r if m in sys.modules)))
+'''
+
+
+def time_import(module):
+    output = subprocess.check_output(
+        [sys.executable, '-c', SCRIPT % (module, DEFERRED_MODULES)])
+    elapsed, loaded = output.split()[0], output.split()[1:]
+    return float(elapsed), loaded[0] if loaded else '-'
+
+
+def main(repeat=5):
+    print_row('module', 'import (ms)', 'deferred modules loaded')
+
+    for module in MODULES:
+        timings = []
+        for _ in range(repeat):
+            elapsed, loaded = time_import(module)
+            timings.append(elapsed)
+
+        print_row(module, '%.1f' % (min(timings) * 1000), loaded)
+
+
+if __name__ == '__main__':
+    main()
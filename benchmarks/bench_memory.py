@@ -0,0 +1,67 @@
+'''Measures the memory held by the entries of a document, in bytes per entry.
+
+The size of an entry is the size of every object reachable from it, counting
+objects shared between entries (like interned strings) only once.
+
+    $ python -m benchmarks.bench_memory
+'''
+
+import sys
+
+from benchmarks.common import DIALECTS
+from benchmarks.common import make_entries
+from benchmarks.common import print_row
+
+
+def get_referents(obj):
+    if isinstance(obj, dict):
+        return list(obj.keys()) + list(obj.values())
+
+    if isinstance(obj, (list, tuple)):
+        return list(obj)
+
+    referents = []
+
+    obj_dict = getattr(obj, '__dict__', None)
+    if obj_dict is not None and not isinstance(obj, type):
+        referents.append(obj_dict)
+
+    for cls in type(obj).__mro__:
+        for slot in cls.__dict__.get('__slots__', ()):
+            if hasattr(obj, slot):
+                referents.append(getattr(obj, slot))
+
+    return referents
+
+
+def get_total_size(objs, seen):
+    total = 0
+
+    stack = list(objs)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(get_referents(obj))
+
+    return total
+
+
+def main(num_entries=10000):
+    print_row('dialect', 'bytes per entry')
+
+    for dialect in DIALECTS:
+        entries = list(make_entries(num_entries, dialect))
+
+        # Singletons are shared by all entries
+        seen = set([id(None), id(True), id(False)])
+
+        total = get_total_size(entries, seen)
+        print_row(dialect, '%d' % (total // num_entries))
+
+
+if __name__ == '__main__':
+    main()
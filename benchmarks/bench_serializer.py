@@ -0,0 +1,52 @@
+'''Compares the charset validation of Mt94xSerializer against the regular
+expressions it used before, and against TrustedMt94xSerializer which does not
+validate at all.
+
+    $ python -m benchmarks.bench_serializer
+'''
+
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.serializer import TrustedMt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+from benchmarks.common import DIALECTS
+from benchmarks.common import best_of
+from benchmarks.common import make_document
+from benchmarks.common import print_row
+from benchmarks.common import write_document
+
+
+class RegexMt94xSerializer(Mt94xSerializer):
+    '''Validates using the alternation patterns, like before.'''
+
+    def value_in_charset(self, value, charset):
+        if charset == self.swift_charset_numbers:
+            return bool(self.rx_nums.match(value))
+
+        return bool(self.rx_chars.match(value))
+
+
+def main(num_entries=10000):
+    print_row('dialect', 'regex (s)', 'translate (s)', 'trusted (s)')
+
+    for dialect in DIALECTS:
+        doc = make_document(num_entries, dialect)
+
+        regex_writer = Mt94xWriter(RegexMt94xSerializer())
+        writer = Mt94xWriter(Mt94xSerializer())
+        trusted_writer = Mt94xWriter(TrustedMt94xSerializer())
+
+        # All must produce the same output
+        output = write_document(writer, doc, dialect)
+        assert write_document(regex_writer, doc, dialect) == output
+        assert write_document(trusted_writer, doc, dialect) == output
+
+        regex = best_of(lambda: write_document(regex_writer, doc, dialect))
+        translate = best_of(lambda: write_document(writer, doc, dialect))
+        trusted = best_of(lambda: write_document(trusted_writer, doc, dialect))
+
+        print_row(dialect, '%.3f' % regex, '%.3f' % translate, '%.3f' % trusted)
+
+
+if __name__ == '__main__':
+    main()
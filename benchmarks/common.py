@@ -0,0 +1,158 @@
+'''Synthetic documents and timing helpers shared by the benchmarks.'''
+
+from collections import OrderedDict
+from datetime import datetime
+from datetime import timedelta
+from decimal import Decimal
+import time
+
+from libmt94x.document import Mt940Document
+from libmt94x.fields import AccountIdentification
+from libmt94x.fields import ClosingAvailableBalance
+from libmt94x.fields import ClosingBalance
+from libmt94x.fields import ExportInformation
+from libmt94x.fields import ForwardAvailableBalance
+from libmt94x.fields import ImportInformation
+from libmt94x.fields import InformationToAccountOwner
+from libmt94x.fields import InformationToAccountOwnerTotals
+from libmt94x.fields import OpeningBalance
+from libmt94x.fields import StatementLine
+from libmt94x.fields import StatementNumber
+from libmt94x.fields import TransactionReferenceNumber
+from libmt94x.info_acct_owner_subfields import CounterPartyID
+from libmt94x.info_acct_owner_subfields import CreditorID
+from libmt94x.info_acct_owner_subfields import EndToEndReference
+from libmt94x.info_acct_owner_subfields import MandateReference
+from libmt94x.info_acct_owner_subfields import RemittanceInformation
+from libmt94x.remittance_info import UnstructuredRemittanceInfo
+
+
+DIALECT_IBP_STRUCTURED = 'ibp-structured'
+DIALECT_IBP_UNSTRUCTURED = 'ibp-unstructured'
+DIALECT_MING = 'ming'
+
+DIALECTS = (
+    DIALECT_IBP_STRUCTURED,
+    DIALECT_IBP_UNSTRUCTURED,
+    DIALECT_MING,
+)
+
+
+def make_entry(idx, dialect, minor_units=False):
+    value_date = datetime(2014, 1, 1) + timedelta(days=idx % 30)
+
+    line = StatementLine(
+        value_date=value_date,
+        book_date=value_date if dialect == DIALECT_MING else None,
+        type=StatementLine.TYPE_CREDIT if idx % 3 else StatementLine.TYPE_DEBIT,
+        amount=idx % 100000 if minor_units else Decimal(idx % 100000) / 100,
+        transaction_code='TRF' if idx % 2 else 'DDT',
+        reference_for_account_owner='EREF',
+        transaction_reference='%014d' % idx if dialect == DIALECT_MING else None,
+        ing_transaction_code='00100' if dialect == DIALECT_MING else None,
+    )
+
+    info = InformationToAccountOwner(
+        code_words=[
+            EndToEndReference('E2E%016d' % idx),
+            MandateReference('MND-%08d' % idx),
+            CreditorID('NL32ZZZ999999991234'),
+            CounterPartyID(
+                account_number='NL32INGB%010d' % idx,
+                bic='INGBNL2A',
+                name='ING Bank N.V. inzake WeB',
+                city='AMSTERDAM',
+            ),
+            RemittanceInformation(
+                remittance_info=UnstructuredRemittanceInfo(
+                    'Factuurnr %08d Klantnr %05d' % (idx, idx % 10000),
+                ),
+            ),
+        ],
+    )
+    if dialect == DIALECT_IBP_UNSTRUCTURED:
+        info.flatten()
+
+    return line, [info]
+
+def make_entries(num_entries, dialect, minor_units=False):
+    for idx in xrange(num_entries):
+        yield make_entry(idx, dialect, minor_units=minor_units)
+
+def make_pooled_entries(num_entries, dialect, pool_size, minor_units=False):
+    '''Returns a generator of `num_entries` entries that cycle through a pool of
+    `pool_size` distinct entries, so that even millions of entries cost
+    next to nothing to produce and hold.'''
+
+    # NOTE: Not a generator function, so the pool is created right away
+    pool = list(make_entries(min(num_entries, pool_size), dialect,
+                             minor_units=minor_units))
+    return (pool[idx % len(pool)] for idx in xrange(num_entries))
+
+def make_document(num_entries, dialect, lazy=False, minor_units=False, pool_size=None):
+    '''Returns a document with `num_entries` entries. A lazy document holds a
+    generator of entries and can therefore only be written once. With
+    `minor_units` the amounts of the entries are ints instead of Decimals.
+    With `pool_size` the entries are drawn from a pool (see
+    make_pooled_entries); since they repeat they cannot be the keys of an
+    OrderedDict, so this requires `lazy`.'''
+
+    if pool_size and not lazy:
+        raise ValueError("Pooled entries require a lazy document")
+
+    if pool_size:
+        entries = make_pooled_entries(num_entries, dialect, pool_size,
+                                      minor_units=minor_units)
+    else:
+        entries = make_entries(num_entries, dialect, minor_units=minor_units)
+
+    if not lazy:
+        entries = OrderedDict(entries)
+
+    balance_args = (datetime(2014, 1, 31), 'EUR', Decimal('1234567.89'))
+
+    return Mt940Document(
+        export_info=ExportInformation('INGBNL2AXXXX', '00001'),
+        import_info=ImportInformation('INGBNL2AXXXX', '00001'),
+        transaction_reference_number=TransactionReferenceNumber('P140220000000001'),
+        account_identification=AccountIdentification('NL69INGB0123456789', 'EUR'),
+        statement_number=StatementNumber('00001'),
+        opening_balance=OpeningBalance(OpeningBalance.TYPE_CREDIT, *balance_args),
+        entries=entries,
+        closing_balance=ClosingBalance(ClosingBalance.TYPE_CREDIT, *balance_args),
+        closing_available_balance=ClosingAvailableBalance(
+            ClosingAvailableBalance.TYPE_CREDIT, *balance_args),
+        forward_available_balances=[
+            ForwardAvailableBalance(ForwardAvailableBalance.TYPE_CREDIT, *balance_args),
+        ],
+        info_to_acct_owner_totals=InformationToAccountOwnerTotals(
+            num_entries // 3, num_entries - num_entries // 3,
+            Decimal('1000.00'), Decimal('2000.00'),
+        ),
+    )
+
+def write_document(writer, doc, dialect):
+    if dialect == DIALECT_MING:
+        return writer.write_document_ming(doc)
+
+    return writer.write_document_ibp(doc)
+
+def iter_document(writer, doc, dialect):
+    if dialect == DIALECT_MING:
+        return writer.iter_document_ming(doc)
+
+    return writer.iter_document_ibp(doc)
+
+def best_of(func, repeat=3):
+    '''Returns the fastest of `repeat` runs of `func` in seconds.'''
+
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        timings.append(time.time() - start)
+
+    return min(timings)
+
+def print_row(*cols):
+    print('  '.join('%-22s' % col for col in cols))
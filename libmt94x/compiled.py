@@ -0,0 +1,259 @@
+from functools import partial
+from operator import attrgetter
+import timeit
+
+from libmt94x.fields import ClosingAvailableBalance
+from libmt94x.fields import ClosingBalance
+from libmt94x.fields import ForwardAvailableBalance
+from libmt94x.fields import OpeningBalance
+from libmt94x.fields import StatementLine
+from libmt94x.writer import Mt94xWriter
+
+
+def get_type(field):
+    return b'C' if field.type == field.TYPE_CREDIT else b'D'
+
+
+def get_or_empty(attribute):
+    def get_value(obj):
+        return getattr(obj, attribute) or b''
+
+    return get_value
+
+
+class RecordPlan(object):
+    '''A record layout compiled against a serializer.
+
+    The layout is a sequence of steps named after the chaining API of the
+    serializer, like ('chars', 16, value) or ('newline',). The value of a step
+    is either a constant, which is serialized once when compiling, or a
+    function that takes the field being written and returns the value. The
+    constant parts end up in a single template, so rendering a record only
+    serializes the values that vary.'''
+
+    def __init__(self, serializer, layout):
+        parts = []
+        steps = []
+
+        for step in layout:
+            method, args = step[0], step[1:]
+
+            if method == 'newline':
+                parts.append(serializer.serialize_newline())
+                continue
+
+            serialize = self.get_serialize_function(serializer, method, args[:-1])
+            value = args[-1]
+
+            if callable(value):
+                parts.append(b'%s')
+                steps.append((serialize, value))
+            else:
+                parts.append(serialize(value).replace(b'%', b'%%'))
+
+        self.template = b''.join(parts)
+        self.steps = tuple(steps)
+
+    @classmethod
+    def get_serialize_function(cls, serializer, method, args):
+        '''Returns a function that serializes a single value like the
+        chaining method `method` does when called with `args` first.'''
+
+        if method == 'tag':
+            return partial(serializer.serialize_tag, *args)
+
+        if method == 'chars':
+            return partial(serializer.serialize_value, serializer.TYPE_CHARACTER, *args)
+
+        if method == 'chars_noslash':
+            return partial(serializer.serialize_value_noslash, *args)
+
+        if method == 'num':
+            return partial(serializer.serialize_value, serializer.TYPE_NUMERIC, *args)
+
+        if method == 'amount':
+            return partial(serializer.serialize_amount, *args)
+
+        if method == 'date_yymmdd':
+            return partial(serializer.serialize_day, '%y%m%d')
+
+        if method == 'date_mmdd':
+            return partial(serializer.serialize_day, '%m%d')
+
+        raise ValueError("Cannot compile step: %s" % method)
+
+    def render(self, obj):
+        return self.template % tuple([serialize(get_value(obj))
+                                      for serialize, get_value in self.steps])
+
+
+class CompiledMt94xWriter(Mt94xWriter):
+    '''Writes the same output as Mt94xWriter, but compiles the layout of the
+    records that make up the bulk of a document (statement lines, their
+    information to account owner and the balances) into a RecordPlan per
+    dialect once, when the writer is created. Plans for code words are
+    compiled from the `items` of their class on first use.
+
+    The plans are compiled against `serializer`, so assigning another
+    serializer to the writer later does not affect them.'''
+
+    def __init__(self, serializer, stats=None):
+        super(CompiledMt94xWriter, self).__init__(serializer, stats=stats)
+
+        self._statement_line_ibp = RecordPlan(serializer, self.get_statement_line_layout_ibp())
+        self._statement_line_ming = RecordPlan(serializer, self.get_statement_line_layout_ming())
+
+        self._closing_available_balance = RecordPlan(
+            serializer, self.get_balance_layout(4, ClosingAvailableBalance.tag))
+        self._closing_balance = RecordPlan(
+            serializer, self.get_balance_layout(5, ClosingBalance.tag))
+        self._forward_available_balance = RecordPlan(
+            serializer, self.get_balance_layout(4, ForwardAvailableBalance.tag))
+        self._opening_balance = RecordPlan(
+            serializer, self.get_balance_layout(5, OpeningBalance.tag))
+
+        # code word class -> plan
+        self._code_word_plans = {}
+
+    # Instrumentation
+
+    def _instrument(self, stats):
+        '''Also reports the code words, which are rendered from their plans
+        rather than written with _write_code_word.'''
+
+        super(CompiledMt94xWriter, self)._instrument(stats)
+
+        self._render_code_word = self._timed_render_code_word(stats, self._render_code_word)
+
+    def _timed_render_code_word(self, stats, method):
+        timer = timeit.default_timer
+
+        def timed_render_code_word(code_word):
+            start = timer()
+            bytes = method(code_word)
+            elapsed = timer() - start
+
+            stats.record(code_word.__class__.__name__, len(bytes), elapsed)
+            return bytes
+
+        return timed_render_code_word
+
+    # Layouts
+
+    def get_balance_layout(self, maxlen, tag):
+        return (
+            ('tag', maxlen, tag),
+            ('chars', 1, get_type),
+            ('date_yymmdd', attrgetter('date')),
+            ('chars', 3, attrgetter('currency')),
+            ('amount', 15, None, attrgetter('amount')),
+            ('newline',),
+        )
+
+    def get_code_word_layout(self, cls):
+        layout = [('chars', 5, b'/%s' % cls.tag)]
+
+        for attribute, maxlen, slash_allowed in cls.items:
+            layout.append(('chars', 1, b'/'))
+            layout.append(('chars' if slash_allowed else 'chars_noslash',
+                           maxlen, get_or_empty(attribute)))
+
+        layout.append(('chars', 1, b'/'))
+        return layout
+
+    def get_statement_line_layout_ibp(self):
+        return (
+            ('tag', 4, StatementLine.tag),
+            ('date_yymmdd', attrgetter('value_date')),
+            ('chars', 1, get_type),
+            ('amount', 15, None, attrgetter('amount')),
+            ('chars', 4, lambda sl: b'N%s' % sl.transaction_code),
+            ('chars_noslash', 16, lambda sl: sl.reference_for_account_owner or b'NONREF'),
+            ('chars_noslash', 16, get_or_empty('account_servicing_institutions_reference')),
+            ('chars', 34, self._get_supplementary_details_ibp),
+            ('newline',),
+        )
+
+    def get_statement_line_layout_ming(self):
+        return (
+            ('tag', 4, StatementLine.tag),
+            ('date_yymmdd', attrgetter('value_date')),
+            ('date_mmdd', attrgetter('book_date')),
+            ('chars', 1, get_type),
+            ('amount', 15, None, attrgetter('amount')),
+            ('chars', 4, lambda sl: b'N%s' % sl.transaction_code),
+            ('chars_noslash', 16, lambda sl: sl.reference_for_account_owner or b'NONREF'),
+            ('chars', 2, b'//'),
+            ('chars_noslash', 14, attrgetter('transaction_reference')),
+            ('newline',),
+            ('chars', 34, lambda sl: b'/TRCD/%s/' % sl.ing_transaction_code),
+            ('newline',),
+        )
+
+    # Code words
+
+    def _render_code_word(self, code_word):
+        cls = code_word.__class__
+
+        try:
+            plan = self._code_word_plans[cls]
+        except KeyError:
+            plan = self._code_word_plans[cls] = RecordPlan(
+                self._serializer, self.get_code_word_layout(cls))
+
+        return plan.render(code_word)
+
+    # Fields
+
+    def write_closing_available_balance(self, cab):
+        return self.serializer.emit(self._closing_available_balance.render(cab))
+
+    def write_closing_balance(self, cb):
+        return self.serializer.emit(self._closing_balance.render(cb))
+
+    def write_forward_available_balance(self, fab):
+        return self.serializer.emit(self._forward_available_balance.render(fab))
+
+    def write_opening_balance(self, ob):
+        return self.serializer.emit(self._opening_balance.render(ob))
+
+    def write_information_to_account_owner_ibp(self, info):
+        maxlen = 6 * 65
+        serializer = self.serializer
+
+        parts = [self._render_code_word(code_word) for code_word in info.code_words]
+
+        if info.free_form_text:
+            parts.append(serializer.serialize_value(
+                serializer.TYPE_CHARACTER, maxlen, info.free_form_text))
+
+        parts.append(serializer.serialize_newline())
+
+        # The tag is not counted when breaking lines
+        body = b''.join(parts)
+        if len(body) > maxlen:
+            raise ValueError("Record exceeds maximum length: %s" % maxlen)
+
+        record = serializer.serialize_tag(5, info.tag) + serializer.serialize_wrapped(65, body)
+        return serializer.emit(record)
+
+    def write_information_to_account_owner_ming(self, info):
+        maxlen = 6 * 65
+        serializer = self.serializer
+
+        parts = [serializer.serialize_tag(5, info.tag)]
+        parts.extend([self._render_code_word(code_word)
+                      for code_word in info.get_ordered_code_words()])
+        parts.append(serializer.serialize_newline())
+
+        body = b''.join(parts)
+        if len(body) > maxlen:
+            raise ValueError("Record exceeds maximum length: %s" % maxlen)
+
+        return serializer.emit(serializer.serialize_wrapped(65, body))
+
+    def write_statement_line_ibp(self, sl):
+        return self.serializer.emit(self._statement_line_ibp.render(sl))
+
+    def write_statement_line_ming(self, sl):
+        return self.serializer.emit(self._statement_line_ming.render(sl))
@@ -1,7 +1,5 @@
 import re
 
-from unidecode import unidecode
-
 from libmt94x.serializer import Mt94xSerializer
 
 
@@ -24,6 +22,10 @@ class CharsetHelper(object):
         if not st:
             return st
 
+        # NOTE: Imported here because loading unidecode is slow and most users
+        # of the library never call this
+        from unidecode import unidecode
+
         # Translate accented characters to ascii equivalents (unidecode
         # requires unicode value)
         if type(st) is bytes:
@@ -1,33 +1,228 @@
-import pycountry
-
-
 class InvalidCurrencyCodeError(Exception):
     pass
 
 
 class CurrencyCodes(object):
+    '''ISO 4217 currency codes. The table is bundled so that validating a
+    currency does not require loading the pycountry database.'''
+
     instance = None
 
+    # Generated from pycountry 1.20
+    codes = {
+        'AED': 'UAE Dirham',
+        'AFN': 'Afghani',
+        'ALL': 'Lek',
+        'AMD': 'Armenian Dram',
+        'ANG': 'Netherlands Antillian Guilder',
+        'AOA': 'Kwanza',
+        'ARS': 'Argentine Peso',
+        'AUD': 'Australian Dollar',
+        'AWG': 'Aruban Guilder',
+        'AZN': 'Azerbaijanian Manat',
+        'BAM': 'Convertible Marks',
+        'BBD': 'Barbados Dollar',
+        'BDT': 'Taka',
+        'BGN': 'Bulgarian Lev',
+        'BHD': 'Bahraini Dinar',
+        'BIF': 'Burundi Franc',
+        'BMD': 'Bermudian Dollar',
+        'BND': 'Brunei Dollar',
+        'BOB': 'Boliviano',
+        'BOV': 'Mvdol',
+        'BRL': 'Brazilian Real',
+        'BSD': 'Bahamian Dollar',
+        'BTN': 'Ngultrum',
+        'BWP': 'Pula',
+        'BYR': 'Belarussian Ruble',
+        'BZD': 'Belize Dollar',
+        'CAD': 'Canadian Dollar',
+        'CDF': 'Congolese Franc',
+        'CHE': 'WIR Euro',
+        'CHF': 'Swiss Franc',
+        'CHW': 'WIR Franc',
+        'CLF': 'Unidades de fomento',
+        'CLP': 'Chilean Peso',
+        'CNY': 'Yuan Renminbi',
+        'COP': 'Colombian Peso',
+        'COU': 'Unidad de Valor Real',
+        'CRC': 'Costa Rican Colon',
+        'CUP': 'Cuban Peso',
+        'CVE': 'Cape Verde Escudo',
+        'CYP': 'Cyprus Pound',
+        'CZK': 'Czech Koruna',
+        'DJF': 'Djibouti Franc',
+        'DKK': 'Danish Krone',
+        'DOP': 'Dominican Peso',
+        'DZD': 'Algerian Dinar',
+        'EEK': 'Kroon',
+        'EGP': 'Egyptian Pound',
+        'ERN': 'Nakfa',
+        'ETB': 'Ethiopian Birr',
+        'EUR': 'Euro',
+        'FJD': 'Fiji Dollar',
+        'FKP': 'Falkland Islands Pound',
+        'GBP': 'Pound Sterling',
+        'GEL': 'Lari',
+        'GHS': 'Ghana Cedi',
+        'GIP': 'Gibraltar Pound',
+        'GMD': 'Dalasi',
+        'GNF': 'Guinea Franc',
+        'GTQ': 'Quetzal',
+        'GYD': 'Guyana Dollar',
+        'HKD': 'Hong Kong Dollar',
+        'HNL': 'Lempira',
+        'HRK': 'Croatian Kuna',
+        'HTG': 'Gourde',
+        'HUF': 'Forint',
+        'IDR': 'Rupiah',
+        'ILS': 'New Israeli Sheqel',
+        'INR': 'Indian Rupee',
+        'IQD': 'Iraqi Dinar',
+        'IRR': 'Iranian Rial',
+        'ISK': 'Iceland Krona',
+        'JMD': 'Jamaican Dollar',
+        'JOD': 'Jordanian Dinar',
+        'JPY': 'Yen',
+        'KES': 'Kenyan Shilling',
+        'KGS': 'Som',
+        'KHR': 'Riel',
+        'KMF': 'Comoro Franc',
+        'KPW': 'North Korean Won',
+        'KRW': 'Won',
+        'KWD': 'Kuwaiti Dinar',
+        'KYD': 'Cayman Islands Dollar',
+        'KZT': 'Tenge',
+        'LAK': 'Kip',
+        'LBP': 'Lebanese Pound',
+        'LKR': 'Sri Lanka Rupee',
+        'LRD': 'Liberian Dollar',
+        'LSL': 'Loti',
+        'LTL': 'Lithuanian Litas',
+        'LVL': 'Latvian Lats',
+        'LYD': 'Libyan Dinar',
+        'MAD': 'Moroccan Dirham',
+        'MDL': 'Moldovan Leu',
+        'MGA': 'Malagasy Ariary',
+        'MKD': 'Denar',
+        'MMK': 'Kyat',
+        'MNT': 'Tugrik',
+        'MOP': 'Pataca',
+        'MRO': 'Ouguiya',
+        'MTL': 'Maltese Lira',
+        'MUR': 'Mauritius Rupee',
+        'MVR': 'Rufiyaa',
+        'MWK': 'Kwacha',
+        'MXN': 'Mexican Peso',
+        'MXV': 'Mexican Unidad de Inversion (UDI)',
+        'MYR': 'Malaysian Ringgit',
+        'MZN': 'Metical',
+        'NAD': 'Namibia Dollar',
+        'NGN': 'Naira',
+        'NIO': 'Cordoba Oro',
+        'NOK': 'Norwegian Krone',
+        'NPR': 'Nepalese Rupee',
+        'NZD': 'New Zealand Dollar',
+        'OMR': 'Rial Omani',
+        'PAB': 'Balboa',
+        'PEN': 'Nuevo Sol',
+        'PGK': 'Kina',
+        'PHP': 'Philippine Peso',
+        'PKR': 'Pakistan Rupee',
+        'PLN': 'Zloty',
+        'PYG': 'Guarani',
+        'QAR': 'Qatari Rial',
+        'RON': 'New Leu',
+        'RSD': 'Serbian Dinar',
+        'RUB': 'Russian Ruble',
+        'RWF': 'Rwanda Franc',
+        'SAR': 'Saudi Riyal',
+        'SBD': 'Solomon Islands Dollar',
+        'SCR': 'Seychelles Rupee',
+        'SDG': 'Sudanese Pound',
+        'SEK': 'Swedish Krona',
+        'SGD': 'Singapore Dollar',
+        'SHP': 'Saint Helena Pound',
+        'SLL': 'Leone',
+        'SOS': 'Somali Shilling',
+        'SRD': 'Surinam Dollar',
+        'STD': 'Dobra',
+        'SVC': 'El Salvador Colon',
+        'SYP': 'Syrian Pound',
+        'SZL': 'Lilangeni',
+        'THB': 'Baht',
+        'TJS': 'Somoni',
+        'TMM': 'Manat',
+        'TND': 'Tunisian Dinar',
+        'TOP': "Pa'anga",
+        'TRY': 'New Turkish Lira',
+        'TTD': 'Trinidad and Tobago Dollar',
+        'TWD': 'New Taiwan Dollar',
+        'TZS': 'Tanzanian Shilling',
+        'UAH': 'Hryvnia',
+        'UGX': 'Uganda Shilling',
+        'USD': 'US Dollar',
+        'USN': 'US Dollar (Next day)',
+        'USS': 'US Dollar (Same day)',
+        'UYI': 'Uruguay Peso en Unidades Indexadas',
+        'UYU': 'Peso Uruguayo',
+        'UZS': 'Uzbekistan Sum',
+        'VEF': 'Bolivar Fuerte',
+        'VND': 'Dong',
+        'VUV': 'Vatu',
+        'WST': 'Tala',
+        'XAF': 'CFA Franc BEAC',
+        'XAG': 'Silver',
+        'XAU': 'Gold',
+        'XBA': 'European Composite Unit (EURCO)',
+        'XBB': 'European Monetary Unit (E.M.U.-6)',
+        'XBC': 'European Unit of Account 9 (E.U.A.-9)',
+        'XBD': 'European Unit of Account 17 (E.U.A.-17)',
+        'XCD': 'East Caribbean Dollar',
+        'XDR': 'Special Drawing Rights',
+        'XFO': 'Gold-Franc',
+        'XFU': 'UIC-Franc',
+        'XOF': 'CFA Franc BCEAO',
+        'XPD': 'Palladium',
+        'XPF': 'CFP Franc',
+        'XPT': 'Platinum',
+        'XTS': 'Code for testing purposes',
+        'XXX': 'No currency',
+        'YER': 'Yemeni Rial',
+        'ZAR': 'Rand',
+        'ZMK': 'Zambian Kwacha',
+        'ZWD': 'Zimbabwe Dollar',
+    }
+
     @classmethod
     def get_instance(cls):
-        '''This class stores no state, so we can store a global instance in the
-        class and give it out on demand.'''
+        '''The only state of this class is the table of codes, which never
+        changes, so we can store a global instance in the class and give it
+        out on demand.'''
 
         if cls.instance is None:
             cls.instance = cls()
 
         return cls.instance
 
+    def __init__(self):
+        # code -> name, loaded on first use
+        self._codes = None
+
+    def _load_codes(self):
+        return self.codes
+
+    def get_codes(self):
+        if self._codes is None:
+            self._codes = self._load_codes()
+
+        return self._codes
+
     def code_is_valid(self, code):
-        try:
-            self.resolve_code(code)
-            return True
-        except InvalidCurrencyCodeError:
-            return False
+        return code in self.get_codes()
 
     def resolve_code(self, code):
         try:
-            currency = pycountry.currencies.get(letter=code)
-            return currency.name
+            return self.get_codes()[code]
         except KeyError:
             raise InvalidCurrencyCodeError("Code not found: %s" % code)
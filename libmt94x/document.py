@@ -9,6 +9,7 @@ from libmt94x.fields import ImportInformation
 from libmt94x.fields import InformationToAccountOwner
 from libmt94x.fields import InformationToAccountOwnerTotals
 from libmt94x.fields import OpeningBalance
+from libmt94x.fields import StatementLine
 from libmt94x.fields import StatementNumber
 from libmt94x.fields import TransactionReferenceNumber
 
@@ -27,7 +28,8 @@ class Mt940Document(object):
                  forward_available_balances=None,
                  info_to_acct_owner_totals=None):
 
-        # entries: { statement_line -> [ info_to_acct_owner] }
+        # entries: { statement_line -> [ info_to_acct_owner] }, or an iterable
+        # of (statement_line, [ info_to_acct_owner ]) pairs
         entries = entries or OrderedDict()
         forward_available_balances = forward_available_balances or []
 
@@ -62,24 +64,27 @@ class Mt940Document(object):
                 "an instance of OpeningBalance")
 
         # NOTE: We say OrderedDict, not just dict, otherwise the order of the
-        # entries in the document is undefined
-        if not isinstance(entries, OrderedDict):
-            raise ValueError(
-                "Value `entries` must be "
-                "an OrderedDict whose values are lists of "
-                "InformationToAccountOwnerTotals")
-        for infos in entries.values():
-            if not isinstance(infos, list):
-                raise ValueError(
-                    "Value `entries` must be "
-                    "an OrderedDict whose values are lists of "
-                    "InformationToAccountOwnerTotals")
-            for info in infos:
-                if not isinstance(info, InformationToAccountOwner):
+        # entries in the document is undefined. Any other iterable of
+        # (statement_line, infos) pairs (eg. a generator) is accepted as well,
+        # but those pairs are only validated as they are consumed.
+        if isinstance(entries, OrderedDict):
+            for infos in entries.values():
+                if not isinstance(infos, list):
                     raise ValueError(
                         "Value `entries` must be "
                         "an OrderedDict whose values are lists of "
                         "InformationToAccountOwnerTotals")
+                for info in infos:
+                    if not isinstance(info, InformationToAccountOwner):
+                        raise ValueError(
+                            "Value `entries` must be "
+                            "an OrderedDict whose values are lists of "
+                            "InformationToAccountOwnerTotals")
+        elif isinstance(entries, dict) or not hasattr(entries, '__iter__'):
+            raise ValueError(
+                "Value `entries` must be "
+                "an OrderedDict whose values are lists of "
+                "InformationToAccountOwnerTotals")
 
         if not isinstance(closing_balance, ClosingBalance):
             raise ValueError(
@@ -113,3 +118,37 @@ class Mt940Document(object):
         self.closing_available_balance = closing_available_balance
         self.forward_available_balances = forward_available_balances
         self.info_to_acct_owner_totals = info_to_acct_owner_totals
+
+    def validate_entry(self, entry):
+        '''Validates a single (statement_line, infos) pair of a lazily
+        consumed `entries` iterable.'''
+
+        try:
+            statement_line, infos = entry
+        except (TypeError, ValueError):
+            raise ValueError(
+                "Value `entries` must yield "
+                "(StatementLine, [InformationToAccountOwner]) pairs")
+
+        if (not isinstance(statement_line, StatementLine) or
+            not isinstance(infos, list) or
+            not all(isinstance(info, InformationToAccountOwner) for info in infos)):
+            raise ValueError(
+                "Value `entries` must yield "
+                "(StatementLine, [InformationToAccountOwner]) pairs")
+
+        return statement_line, infos
+
+    def iter_entries(self):
+        '''Yields the (statement_line, infos) pairs of the document. If the
+        entries were not given as an OrderedDict they are validated lazily
+        here, and if they were given as an iterator they can only be iterated
+        over once.'''
+
+        if isinstance(self.entries, OrderedDict):
+            for entry in self.entries.iteritems():
+                yield entry
+            return
+
+        for entry in self.entries:
+            yield self.validate_entry(entry)
@@ -1,30 +1,13 @@
+from datetime import date as date_type
 from datetime import datetime
 from decimal import Decimal
+from itertools import izip
+from itertools import repeat
 
 from libmt94x.currency_codes import CurrencyCodes
-from libmt94x.info_acct_owner_subfields import BeneficiaryParty
-from libmt94x.info_acct_owner_subfields import BusinessPurpose
-from libmt94x.info_acct_owner_subfields import Charges
-from libmt94x.info_acct_owner_subfields import ClientReference
-from libmt94x.info_acct_owner_subfields import CounterPartyID
-from libmt94x.info_acct_owner_subfields import CounterPartyIdentification
-from libmt94x.info_acct_owner_subfields import CreditorID
-from libmt94x.info_acct_owner_subfields import EndToEndReference
-from libmt94x.info_acct_owner_subfields import ExchangeRate
 from libmt94x.info_acct_owner_subfields import InfoToAcccountOwnerSubField
-from libmt94x.info_acct_owner_subfields import InstructionID
-from libmt94x.info_acct_owner_subfields import MandateReference
-from libmt94x.info_acct_owner_subfields import OrderingParty
-from libmt94x.info_acct_owner_subfields import PaymentInformationID
-from libmt94x.info_acct_owner_subfields import PurposeCode
-from libmt94x.info_acct_owner_subfields import RemittanceInformation
-from libmt94x.info_acct_owner_subfields import ReturnReason
-from libmt94x.info_acct_owner_subfields import UltimateBeneficiary
-from libmt94x.info_acct_owner_subfields import UltimateCreditor
-from libmt94x.info_acct_owner_subfields import UltimateDebtor
-from libmt94x.remittance_info import DutchStructuredRemittanceInfo
-from libmt94x.remittance_info import IsoStructuredRemittanceInfo
-from libmt94x.remittance_info import UnstructuredRemittanceInfo
+from libmt94x.info_acct_owner_subfields import InfoToAcccountOwnerSubFieldOrder
+from libmt94x.slotutil import SlotsPickleMixin
 from libmt94x.statement_line_subfields import OriginalAmountOfTransaction
 from libmt94x.transaction_codes import IngTransactionCodes
 from libmt94x.transaction_codes import SwiftTransactionCodes
@@ -34,14 +17,22 @@ from libmt94x.transaction_codes import SwiftTransactionCodes
 # signatures
 builtin_type = type
 
+# Dates are either a date or a datetime
+date_types = (date_type, datetime)
 
-class Field(object):
+# Amounts are either a Decimal, or an int (or long) in minor units (cents)
+amount_types = (Decimal, int, long)
+
+
+class Field(SlotsPickleMixin):
     '''Abstract base class for all fields'''
-    pass
+
+    __slots__ = ()
 
 
 class AbstractBalance(Field):
     tag = None
+    __slots__ = ('type', 'date', 'currency', 'amount')
 
     TYPE_CREDIT = 1
     TYPE_DEBIT = 2
@@ -51,15 +42,15 @@ class AbstractBalance(Field):
             raise ValueError(
                 "The `type` value must be TYPE_CREDIT or TYPE_DEBIT")
 
-        if not builtin_type(date) is datetime:
-            raise ValueError("The `date` value must be a datetime")
+        if builtin_type(date) not in date_types:
+            raise ValueError("The `date` value must be a date or datetime")
 
         currency_codes = CurrencyCodes.get_instance()
         if not currency_codes.code_is_valid(currency):
             raise ValueError("Value `currency` is invalid: %s" % currency)
 
-        if not builtin_type(amount) is Decimal:
-            raise ValueError("The `amount` value must be a Decimal")
+        if builtin_type(amount) not in amount_types:
+            raise ValueError("The `amount` value must be a Decimal or an int of minor units")
 
         self.type = type
         self.date = date
@@ -70,6 +61,7 @@ class AbstractBalance(Field):
 
 class AccountIdentification(Field):
     tag = '25'
+    __slots__ = ('iban', 'iso_currency_code')
 
     def __init__(self, iban, iso_currency_code=None):
         currency_codes = CurrencyCodes.get_instance()
@@ -84,15 +76,19 @@ class AccountIdentification(Field):
 
 class ClosingAvailableBalance(AbstractBalance):
     tag = '64'
+    __slots__ = ()
 
 
 class ClosingBalance(AbstractBalance):
     tag = '62F'
+    __slots__ = ()
 
 
 class ExportInformation(Field):
     '''This is part of the IBP header'''
 
+    __slots__ = ('export_address', 'export_number', 'export_time', 'export_day')
+
     def __init__(self, export_address, export_number, export_time=None, export_day=None):
         self.export_address = export_address
         self.export_number = export_number
@@ -102,11 +98,14 @@ class ExportInformation(Field):
 
 class ForwardAvailableBalance(AbstractBalance):
     tag = '65'
+    __slots__ = ()
 
 
 class ImportInformation(Field):
     '''This is part of the IBP header'''
 
+    __slots__ = ('import_address', 'import_number', 'import_time', 'import_day')
+
     def __init__(self, import_address, import_number, import_time=None, import_day=None):
         self.import_address = import_address
         self.import_number = import_number
@@ -116,6 +115,7 @@ class ImportInformation(Field):
 
 class InformationToAccountOwner(Field):
     tag = '86'
+    __slots__ = ('code_words', 'free_form_text')
 
     def __init__(self, code_words=None, free_form_text=None):
         '''The parameters `code_words` and `free_form_text` are exclusive,
@@ -137,11 +137,12 @@ class InformationToAccountOwner(Field):
         self.code_words = code_words
         self.free_form_text = free_form_text
 
-        # Build dictionary mapping the class -> code_word
-        by_class = {}
-        for code_word in code_words:
-            by_class[code_word.__class__] = code_word
-        self.by_class = by_class
+    @property
+    def by_class(self):
+        '''Dictionary mapping the class -> code_word. It is built on demand
+        rather than kept on every instance.'''
+
+        return dict((code_word.__class__, code_word) for code_word in self.code_words)
 
     def flatten(self):
         '''Transform code_words to free_form_text of values delimited by a
@@ -154,61 +155,8 @@ class InformationToAccountOwner(Field):
 
         elems = []
         for code_word in self.code_words:
-            if isinstance(code_word, BeneficiaryParty):
-                maybe_add(elems, code_word.account_number)
-                maybe_add(elems, code_word.bic)
-                maybe_add(elems, code_word.name)
-                maybe_add(elems, code_word.city)
-            elif isinstance(code_word, BusinessPurpose):
-                maybe_add(elems, code_word.id_code)
-                maybe_add(elems, code_word.sepa_transaction_type)
-            elif isinstance(code_word, Charges):
-                maybe_add(elems, code_word.charges)
-            elif isinstance(code_word, ClientReference):
-                maybe_add(elems, code_word.client_reference)
-            elif isinstance(code_word, CounterPartyID):
-                maybe_add(elems, code_word.account_number)
-                maybe_add(elems, code_word.bic)
-                maybe_add(elems, code_word.name)
-                maybe_add(elems, code_word.city)
-            elif isinstance(code_word, CounterPartyIdentification):
-                maybe_add(elems, code_word.id_code)
-            elif isinstance(code_word, CreditorID):
-                maybe_add(elems, code_word.creditor_id)
-            elif isinstance(code_word, EndToEndReference):
-                maybe_add(elems, code_word.end_to_end_reference)
-            elif isinstance(code_word, ExchangeRate):
-                maybe_add(elems, code_word.exchange_rate)
-            elif isinstance(code_word, InstructionID):
-                maybe_add(elems, code_word.instruction_id)
-            elif isinstance(code_word, MandateReference):
-                maybe_add(elems, code_word.mandate_reference)
-            elif isinstance(code_word, OrderingParty):
-                maybe_add(elems, code_word.account_number)
-                maybe_add(elems, code_word.bic)
-                maybe_add(elems, code_word.name)
-                maybe_add(elems, code_word.city)
-            elif isinstance(code_word, PaymentInformationID):
-                maybe_add(elems, code_word.payment_information_id)
-            elif isinstance(code_word, PurposeCode):
-                maybe_add(elems, code_word.purpose_of_collection)
-            elif isinstance(code_word, RemittanceInformation):
-                if isinstance(code_word.remittance_info, UnstructuredRemittanceInfo):
-                    maybe_add(elems, code_word.remittance_info.remittance_info)
-                elif isinstance(code_word.remittance_info, DutchStructuredRemittanceInfo):
-                    maybe_add(elems, code_word.remittance_info.payment_reference)
-                elif isinstance(code_word.remittance_info, IsoStructuredRemittanceInfo):
-                    maybe_add(elems, code_word.remittance_info.iso_reference)
-            elif isinstance(code_word, ReturnReason):
-                maybe_add(elems, code_word.reason_code)
-            elif isinstance(code_word, UltimateBeneficiary):
-                maybe_add(elems, code_word.name)
-            elif isinstance(code_word, UltimateCreditor):
-                maybe_add(elems, code_word.name)
-                maybe_add(elems, code_word.id)
-            elif isinstance(code_word, UltimateDebtor):
-                maybe_add(elems, code_word.name)
-                maybe_add(elems, code_word.id)
+            for value in code_word.get_values():
+                maybe_add(elems, value)
 
         line = ' '.join(elems)
 
@@ -216,11 +164,25 @@ class InformationToAccountOwner(Field):
         self.code_words = []
 
     def get_code_word_by_cls(self, cls_obj):
-        return self.by_class.get(cls_obj)
+        # There are only a handful of code words, so a scan is cheaper than
+        # keeping a dictionary. The last one wins, like it did in by_class.
+        found = None
+        for code_word in self.code_words:
+            if code_word.__class__ is cls_obj:
+                found = code_word
+
+        return found
+
+    def get_ordered_code_words(self):
+        '''Returns the code words in the order in which they must be written,
+        with at most one code word per class.'''
+
+        return InfoToAcccountOwnerSubFieldOrder.sort_code_words(self.code_words)
 
 
 class InformationToAccountOwnerTotals(Field):
     tag = '86'
+    __slots__ = ('num_debit', 'num_credit', 'amount_debit', 'amount_credit')
 
     def __init__(self, num_debit, num_credit, amount_debit, amount_credit):
         if not builtin_type(num_debit) is int:
@@ -229,11 +191,11 @@ class InformationToAccountOwnerTotals(Field):
         if not builtin_type(num_credit) is int:
             raise ValueError("The `num_credit` value must be an int")
 
-        if not builtin_type(amount_debit) is Decimal:
-            raise ValueError("The `amount_debit` value must be a Decimal")
+        if builtin_type(amount_debit) not in amount_types:
+            raise ValueError("The `amount_debit` value must be a Decimal or an int of minor units")
 
-        if not builtin_type(amount_credit) is Decimal:
-            raise ValueError("The `amount_credit` value must be a Decimal")
+        if builtin_type(amount_credit) not in amount_types:
+            raise ValueError("The `amount_credit` value must be a Decimal or an int of minor units")
 
         self.num_debit = num_debit
         self.num_credit = num_credit
@@ -243,10 +205,24 @@ class InformationToAccountOwnerTotals(Field):
 
 class OpeningBalance(AbstractBalance):
     tag = '60F'
+    __slots__ = ()
 
 
 class StatementLine(Field):
     tag = '61'
+    __slots__ = (
+        'value_date',
+        'type',
+        'amount',
+        'transaction_code',
+        'reference_for_account_owner',
+        'supplementary_details',
+        'book_date',
+        'ing_transaction_code',
+        'transaction_reference',
+        'account_servicing_institutions_reference',
+        'original_amount_of_transaction',
+    )
 
     TYPE_CREDIT = 1
     TYPE_DEBIT = 2
@@ -284,17 +260,17 @@ class StatementLine(Field):
         - original_amount_of_transaction
         '''
 
-        if not builtin_type(value_date) is datetime:
-            raise ValueError("The `value_date` value must be a datetime")
+        if builtin_type(value_date) not in date_types:
+            raise ValueError("The `value_date` value must be a date or datetime")
 
-        if book_date is not None and not builtin_type(book_date) is datetime:
-            raise ValueError("The `book_date` value must be a datetime")
+        if book_date is not None and builtin_type(book_date) not in date_types:
+            raise ValueError("The `book_date` value must be a date or datetime")
 
         if type not in (self.TYPE_CREDIT, self.TYPE_DEBIT):
             raise ValueError("The `type` value must be TYPE_CREDIT or TYPE_DEBIT")
 
-        if not builtin_type(amount) is Decimal:
-            raise ValueError("The `amount` value must be a Decimal")
+        if builtin_type(amount) not in amount_types:
+            raise ValueError("The `amount` value must be a Decimal or an int of minor units")
 
         swift_transaction_codes = SwiftTransactionCodes.get_instance()
         if not swift_transaction_codes.code_is_valid(transaction_code):
@@ -324,9 +300,104 @@ class StatementLine(Field):
         self.account_servicing_institutions_reference = account_servicing_institutions_reference
         self.original_amount_of_transaction = original_amount_of_transaction
 
+    @classmethod
+    def from_columns(cls,
+                     value_dates,
+                     types,
+                     amounts,
+                     transaction_codes,
+                     references_for_account_owner,
+                     supplementary_details=None,
+                     book_dates=None,
+                     ing_transaction_codes=None,
+                     transaction_references=None,
+                     account_servicing_institutions_references=None,
+                     original_amounts_of_transaction=None):
+        '''Builds a list of statement lines from columns of values: one
+        sequence per argument of __init__, of equal length. The optional
+        columns may be omitted, or contain None for some lines.
+
+        The values are validated like in __init__, except that every distinct
+        value is validated only once per batch instead of once per line.'''
+
+        columns = [
+            value_dates,
+            types,
+            amounts,
+            transaction_codes,
+            references_for_account_owner,
+            supplementary_details,
+            book_dates,
+            ing_transaction_codes,
+            transaction_references,
+            account_servicing_institutions_references,
+            original_amounts_of_transaction,
+        ]
+
+        num_lines = len(value_dates)
+        for idx, column in enumerate(columns):
+            if column is None:
+                columns[idx] = repeat(None, num_lines)
+            elif len(column) != num_lines:
+                raise ValueError("All columns must have the same length")
+
+        def get_types(column):
+            return set(map(builtin_type, column))
+
+        def get_distinct(column):
+            return set(column) - set([None]) if column is not None else set()
+
+        if not get_types(value_dates) <= set(date_types):
+            raise ValueError("The `value_date` value must be a date or datetime")
+
+        if not get_types(get_distinct(book_dates)) <= set(date_types):
+            raise ValueError("The `book_date` value must be a date or datetime")
+
+        if not set(types) <= set((cls.TYPE_CREDIT, cls.TYPE_DEBIT)):
+            raise ValueError("The `type` value must be TYPE_CREDIT or TYPE_DEBIT")
+
+        if not get_types(amounts) <= set(amount_types):
+            raise ValueError("The `amount` value must be a Decimal or an int of minor units")
+
+        swift_codes = SwiftTransactionCodes.get_instance()
+        for transaction_code in set(transaction_codes):
+            if not swift_codes.code_is_valid(transaction_code):
+                raise ValueError(
+                    "Value `transaction_code` is invalid: %s" % transaction_code)
+
+        ing_codes = IngTransactionCodes.get_instance()
+        for ing_transaction_code in get_distinct(ing_transaction_codes):
+            if not ing_codes.code_is_valid(ing_transaction_code):
+                raise ValueError(
+                    "Value `ing_transaction_code` is invalid: %s" % ing_transaction_code)
+
+        if not get_types(get_distinct(original_amounts_of_transaction)) <= set([OriginalAmountOfTransaction]):
+            raise ValueError("The `original_amount_of_transaction` value must "
+                             "be an instance of OriginalAmountOfTransaction")
+
+        # Everything is valid, so we can bypass __init__
+        lines = []
+        for values in izip(*columns):
+            line = cls.__new__(cls)
+            (line.value_date,
+             line.type,
+             line.amount,
+             line.transaction_code,
+             line.reference_for_account_owner,
+             line.supplementary_details,
+             line.book_date,
+             line.ing_transaction_code,
+             line.transaction_reference,
+             line.account_servicing_institutions_reference,
+             line.original_amount_of_transaction) = values
+            lines.append(line)
+
+        return lines
+
 
 class StatementNumber(Field):
     tag = '28C'
+    __slots__ = ('statement_number',)
 
     def __init__(self, statement_number):
         self.statement_number = statement_number
@@ -334,6 +405,7 @@ class StatementNumber(Field):
 
 class TransactionReferenceNumber(Field):
     tag = '20'
+    __slots__ = ('transaction_reference_number',)
 
     def __init__(self, transaction_reference_number=None):
         self.transaction_reference_number = transaction_reference_number
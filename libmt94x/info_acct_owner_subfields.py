@@ -1,14 +1,34 @@
 from libmt94x.remittance_info import AbstractRemittanceInfo
+from libmt94x.slotutil import SlotsPickleMixin
 from libmt94x.transfer_failed_codes import TransferFailed
 
 
-class InfoToAcccountOwnerSubField(object):
+class InfoToAcccountOwnerSubField(SlotsPickleMixin):
     '''Abstract base class for all subfields of InformationToAcccountOwner'''
-    pass
+
+    __slots__ = ()
+
+    tag = None
+
+    # The items of the subfield in the order in which they are written, as
+    # tuples of (attribute, maxlen, slash allowed)
+    items = ()
+
+    def get_values(self):
+        '''Returns the values of the items, without any delimiters.'''
+
+        return [getattr(self, attribute) for attribute, _, _ in self.items]
 
 
 class BeneficiaryParty(InfoToAcccountOwnerSubField):
     tag = 'BENM'
+    __slots__ = ('account_number', 'bic', 'name', 'city')
+    items = (
+        ('account_number', 35, False),
+        ('bic', 11, False),
+        ('name', 50, False),
+        ('city', 35, False),
+    )
 
     def __init__(self, account_number=None, bic=None, name=None, city=None):
         self.account_number = account_number
@@ -19,6 +39,11 @@ class BeneficiaryParty(InfoToAcccountOwnerSubField):
 
 class BusinessPurpose(InfoToAcccountOwnerSubField):
     tag = 'BUSP'
+    __slots__ = ('id_code', 'sepa_transaction_type')
+    items = (
+        ('id_code', 24, False),
+        ('sepa_transaction_type', 9, False),
+    )
 
     def __init__(self, id_code=None, sepa_transaction_type=None):
         self.id_code = id_code
@@ -27,6 +52,10 @@ class BusinessPurpose(InfoToAcccountOwnerSubField):
 
 class Charges(InfoToAcccountOwnerSubField):
     tag = 'CHGS'
+    __slots__ = ('charges',)
+    items = (
+        ('charges', 15, False),
+    )
 
     def __init__(self, charges):
         self.charges = charges
@@ -34,6 +63,10 @@ class Charges(InfoToAcccountOwnerSubField):
 
 class ClientReference(InfoToAcccountOwnerSubField):
     tag = 'CREF'
+    __slots__ = ('client_reference',)
+    items = (
+        ('client_reference', 35, False),
+    )
 
     def __init__(self, client_reference):
         self.client_reference = client_reference
@@ -43,6 +76,13 @@ class CounterPartyID(InfoToAcccountOwnerSubField):
     '''NL term: Tegenpartij ID'''
 
     tag = 'CNTP'
+    __slots__ = ('account_number', 'bic', 'name', 'city')
+    items = (
+        ('account_number', 35, False),
+        ('bic', 11, False),
+        ('name', 50, False),
+        ('city', 35, False),
+    )
 
     def __init__(self, account_number=None, bic=None, name=None, city=None):
         self.account_number = account_number
@@ -53,6 +93,10 @@ class CounterPartyID(InfoToAcccountOwnerSubField):
 
 class CounterPartyIdentification(InfoToAcccountOwnerSubField):
     tag = 'ID'
+    __slots__ = ('id_code',)
+    items = (
+        ('id_code', 35, False),
+    )
 
     def __init__(self, id_code):
         self.id_code = id_code
@@ -62,6 +106,10 @@ class CreditorID(InfoToAcccountOwnerSubField):
     '''NL term: Incassant ID'''
 
     tag = 'CSID'
+    __slots__ = ('creditor_id',)
+    items = (
+        ('creditor_id', 35, False),
+    )
 
     def __init__(self, creditor_id):
         self.creditor_id = creditor_id
@@ -71,6 +119,10 @@ class EndToEndReference(InfoToAcccountOwnerSubField):
     '''NL term: Uniek kenmerk'''
 
     tag = 'EREF'
+    __slots__ = ('end_to_end_reference',)
+    items = (
+        ('end_to_end_reference', 35, False),
+    )
 
     def __init__(self, end_to_end_reference):
         self.end_to_end_reference = end_to_end_reference
@@ -78,6 +130,10 @@ class EndToEndReference(InfoToAcccountOwnerSubField):
 
 class ExchangeRate(InfoToAcccountOwnerSubField):
     tag = 'EXCH'
+    __slots__ = ('exchange_rate',)
+    items = (
+        ('exchange_rate', 12, False),
+    )
 
     def __init__(self, exchange_rate):
         self.exchange_rate = exchange_rate
@@ -85,6 +141,10 @@ class ExchangeRate(InfoToAcccountOwnerSubField):
 
 class InstructionID(InfoToAcccountOwnerSubField):
     tag = 'IREF'
+    __slots__ = ('instruction_id',)
+    items = (
+        ('instruction_id', 35, False),
+    )
 
     def __init__(self, instruction_id):
         self.instruction_id = instruction_id
@@ -94,6 +154,10 @@ class MandateReference(InfoToAcccountOwnerSubField):
     '''NL term: Machtigingskenmerk'''
 
     tag = 'MARF'
+    __slots__ = ('mandate_reference',)
+    items = (
+        ('mandate_reference', 35, False),
+    )
 
     def __init__(self, mandate_reference):
         self.mandate_reference = mandate_reference
@@ -101,6 +165,13 @@ class MandateReference(InfoToAcccountOwnerSubField):
 
 class OrderingParty(InfoToAcccountOwnerSubField):
     tag = 'ORDP'
+    __slots__ = ('account_number', 'bic', 'name', 'city')
+    items = (
+        ('account_number', 35, False),
+        ('bic', 11, False),
+        ('name', 50, False),
+        ('city', 35, False),
+    )
 
     def __init__(self, account_number=None, bic=None, name=None, city=None):
         self.account_number = account_number
@@ -113,6 +184,10 @@ class PaymentInformationID(InfoToAcccountOwnerSubField):
     '''NL term: Batch ID'''
 
     tag = 'PREF'
+    __slots__ = ('payment_information_id',)
+    items = (
+        ('payment_information_id', 35, False),
+    )
 
     def __init__(self, payment_information_id):
         self.payment_information_id = payment_information_id
@@ -122,6 +197,10 @@ class PurposeCode(InfoToAcccountOwnerSubField):
     '''NL term: Speciale verwerkingscode'''
 
     tag = 'PURP'
+    __slots__ = ('purpose_of_collection',)
+    items = (
+        ('purpose_of_collection', 4, False),
+    )
 
     def __init__(self, purpose_of_collection):
         self.purpose_of_collection = purpose_of_collection
@@ -131,6 +210,11 @@ class RemittanceInformation(InfoToAcccountOwnerSubField):
     '''NL term: Omschrijvingsregels'''
 
     tag = 'REMI'
+    __slots__ = ('remittance_info', 'code', 'issuer')
+    # We allow slashes in this subfield
+    items = (
+        ('qualified_remittance_info', 254, True),
+    )
 
     def __init__(self, remittance_info, code=None, issuer=None):
         if not isinstance(remittance_info, AbstractRemittanceInfo):
@@ -144,11 +228,26 @@ class RemittanceInformation(InfoToAcccountOwnerSubField):
         self.code = code
         self.issuer = issuer
 
+    @property
+    def qualified_remittance_info(self):
+        '''The value prefixed with the kind of remittance info, eg.
+        USTD//<value> or STRD/CUR/<value>'''
+
+        return b'%s/%s' % (self.remittance_info.qualifier,
+                           self.remittance_info.get_value())
+
+    def get_values(self):
+        return [self.remittance_info.get_value()]
+
 
 class ReturnReason(InfoToAcccountOwnerSubField):
     '''NL term: Uitval reden'''
 
     tag = 'RTRN'
+    __slots__ = ('reason_code',)
+    items = (
+        ('reason_code', 4, False),
+    )
 
     def __init__(self, reason_code):
         '''NOTE: The ING IBP spec also mentions a legacy R-Type integer
@@ -171,6 +270,10 @@ class ReturnReason(InfoToAcccountOwnerSubField):
 
 class UltimateBeneficiary(InfoToAcccountOwnerSubField):
     tag = 'ULTB'
+    __slots__ = ('name',)
+    items = (
+        ('name', 35, False),
+    )
 
     def __init__(self, name):
         self.name = name
@@ -180,6 +283,11 @@ class UltimateCreditor(InfoToAcccountOwnerSubField):
     '''NL term: Uiteindelijke incassant'''
 
     tag = 'ULTC'
+    __slots__ = ('name', 'id')
+    items = (
+        ('name', 70, True),
+        ('id', 35, False),
+    )
 
     def __init__(self, name=None, id=None):
         self.name = name
@@ -190,6 +298,11 @@ class UltimateDebtor(InfoToAcccountOwnerSubField):
     '''NL term: Uiteindelijke geincasseerde'''
 
     tag = 'ULTD'
+    __slots__ = ('name', 'id')
+    items = (
+        ('name', 70, True),
+        ('id', 35, False),
+    )
 
     def __init__(self, name=None, id=None):
         self.name = name
@@ -220,6 +333,30 @@ class InfoToAcccountOwnerSubFieldOrder(object):
         Charges,
     )
 
+    # tag -> class
+    fields_by_tag = dict((field_cls.tag, field_cls) for field_cls in fields)
+
+    # class -> position in the order
+    field_positions = dict((field_cls, idx) for idx, field_cls in enumerate(fields))
+
     @classmethod
     def get_field_classes(cls):
         return cls.fields
+
+    @classmethod
+    def get_field_class_by_tag(cls, tag):
+        return cls.fields_by_tag.get(tag)
+
+    @classmethod
+    def sort_code_words(cls, code_words):
+        '''Sorts `code_words` in the order in which they must be written. Only
+        the last code word of each class is kept, and code words of classes
+        that are not part of the order are dropped.'''
+
+        by_position = {}
+        for code_word in code_words:
+            position = cls.field_positions.get(code_word.__class__)
+            if position is not None:
+                by_position[position] = code_word
+
+        return [by_position[idx] for idx in sorted(by_position)]
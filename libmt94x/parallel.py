@@ -0,0 +1,267 @@
+from collections import deque
+from multiprocessing import Pool
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+from libmt94x.parser import Mt94xParser
+from libmt94x.parser import Mt94xSplitter
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.serializer import TrustedMt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+
+# NOTE: Worker processes keep their own parsers, which are created on first use
+# minor_units -> parser
+_parsers = {}
+
+
+def _get_parser(minor_units):
+    if minor_units not in _parsers:
+        _parsers[minor_units] = Mt94xParser(minor_units=minor_units)
+
+    return _parsers[minor_units]
+
+
+def _parse_messages(dialect, minor_units, messages):
+    parse_document = getattr(_get_parser(minor_units), 'parse_document_%s' % dialect)
+    return [parse_document(message) for message in messages]
+
+
+def _validate_messages(dialect, minor_units, messages):
+    parse_document = getattr(_get_parser(minor_units), 'parse_document_%s' % dialect)
+
+    errors = []
+    for message in messages:
+        try:
+            parse_document(message)
+            errors.append(None)
+        # Any error is reported for its message, rather than ending the whole
+        # validation
+        except Exception as e:
+            errors.append(str(e))
+
+    return errors
+
+
+# NOTE: Writers can be shared between threads, but worker processes keep their
+# own, which are created on first use
+# trusted -> writer
+_writers = {}
+
+
+def _get_writer(trusted):
+    if trusted not in _writers:
+        serializer = TrustedMt94xSerializer() if trusted else Mt94xSerializer()
+        _writers[trusted] = Mt94xWriter(serializer)
+
+    return _writers[trusted]
+
+
+def _write_documents(dialect, trusted, docs):
+    write_document = getattr(_get_writer(trusted), 'write_document_%s' % dialect)
+    return [write_document(doc) for doc in docs]
+
+
+def _write_entries(dialect, trusted, entries):
+    iter_entries = getattr(_get_writer(trusted), 'iter_entries_%s' % dialect)
+
+    # A single block per chunk, which is cheaper to send back than records
+    return [b''.join(iter_entries(entries))]
+
+
+def _iter_chunks(items, chunksize):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _map_chunks(pool_class, workers, func, args, chunks):
+    '''Applies `func` to every chunk in `chunks` (after `args`) on a pool of
+    `workers` and yields the results in input order. Only a limited number of
+    chunks is in flight at any time.'''
+
+    pool = pool_class(workers)
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(func, args + (chunk,)))
+
+            # Bound the number of chunks held in memory
+            if len(pending) >= 2 * workers:
+                for result in pending.popleft().get():
+                    yield result
+
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+
+        pool.close()
+
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+class Mt94xParallelParser(object):
+    '''Parses the messages in a multi-message file on a pool of worker
+    processes. Messages are handed to the workers in chunks of `chunksize`,
+    and only a limited number of chunks is in flight at any time, so the
+    input is still consumed as a stream. See Mt94xParser for `minor_units`.'''
+
+    def __init__(self, workers=None, chunksize=100, minor_units=False):
+        self.workers = workers or cpu_count()
+        self.chunksize = chunksize
+        self.minor_units = minor_units
+        self.splitter = Mt94xSplitter()
+
+    def _map(self, func, dialect, source):
+        '''Applies `func` to the chunks of messages in `source` and yields the
+        results in input order.'''
+
+        chunks = _iter_chunks(self.splitter.split(source), self.chunksize)
+        return _map_chunks(Pool, self.workers, func,
+                           (dialect, self.minor_units), chunks)
+
+    def iter_documents_ibp(self, source):
+        '''Yields the documents in `source` in order.'''
+
+        return self._map(_parse_messages, 'ibp', source)
+
+    def iter_documents_ming(self, source):
+        '''Yields the documents in `source` in order.'''
+
+        return self._map(_parse_messages, 'ming', source)
+
+    def validate_documents_ibp(self, source):
+        '''Returns a list of (message index, error) for every message in
+        `source` that cannot be parsed. The documents themselves are not sent
+        back from the workers.'''
+
+        results = self._map(_validate_messages, 'ibp', source)
+        return [(idx, error) for idx, error in enumerate(results) if error is not None]
+
+    def validate_documents_ming(self, source):
+        '''Returns a list of (message index, error) for every message in
+        `source` that cannot be parsed. The documents themselves are not sent
+        back from the workers.'''
+
+        results = self._map(_validate_messages, 'ming', source)
+        return [(idx, error) for idx, error in enumerate(results) if error is not None]
+
+
+class Mt94xParallelWriter(object):
+    '''Writes many documents on a pool of `workers`, which are processes or
+    threads depending on `backend`. Documents are handed to the workers in
+    chunks of `chunksize` and the messages come back in input order as soon
+    as they are ready. Only a limited number of chunks is in flight at any
+    time, so `docs` can be a generator.
+
+    The process backend pickles the documents to the workers and the
+    messages back. The thread backend avoids that, but the writer is pure
+    Python, so threads do not write in parallel; it is meant for when the
+    documents are produced by I/O bound code, or are not picklable.
+
+    A single large document can be written in parallel as well: its entries
+    are handed to the workers in chunks of `entries_chunksize`, while the
+    header and trailer are written here.
+
+    With `trusted` the workers use TrustedMt94xSerializer.'''
+
+    backends = {
+        'process': Pool,
+        'thread': ThreadPool,
+    }
+
+    def __init__(self, workers=None, chunksize=10, backend='process', trusted=False,
+                 entries_chunksize=1000):
+        if backend not in self.backends:
+            raise ValueError("Backend must be one of: %s"
+                             % ', '.join(sorted(self.backends)))
+
+        self.workers = workers or cpu_count()
+        self.chunksize = chunksize
+        self.backend = backend
+        self.trusted = trusted
+        self.entries_chunksize = entries_chunksize
+
+    def _map(self, dialect, docs):
+        chunks = _iter_chunks(docs, self.chunksize)
+        return _map_chunks(self.backends[self.backend], self.workers, _write_documents,
+                           (dialect, self.trusted), chunks)
+
+    def _iter_document(self, dialect, doc):
+        writer = _get_writer(self.trusted)
+
+        for record in getattr(writer, 'iter_header_%s' % dialect)(doc):
+            yield record
+
+        chunks = _iter_chunks(doc.iter_entries(), self.entries_chunksize)
+        blocks = _map_chunks(self.backends[self.backend], self.workers, _write_entries,
+                             (dialect, self.trusted), chunks)
+        for block in blocks:
+            yield block
+
+        for record in getattr(writer, 'iter_trailer_%s' % dialect)(doc):
+            yield record
+
+    def iter_document_ibp(self, doc):
+        '''Yields the header records, the entries in blocks of
+        `entries_chunksize` and the trailer records of a single document.'''
+
+        return self._iter_document('ibp', doc)
+
+    def iter_document_ming(self, doc):
+        '''Yields the header records, the entries in blocks of
+        `entries_chunksize` and the trailer records of a single document.'''
+
+        return self._iter_document('ming', doc)
+
+    def write_document_ibp(self, doc):
+        return b''.join(self.iter_document_ibp(doc))
+
+    def write_document_ming(self, doc):
+        return b''.join(self.iter_document_ming(doc))
+
+    def write_document_ibp_to(self, doc, fp):
+        '''Writes a single document to the file-like object `fp` block by
+        block.'''
+
+        for block in self.iter_document_ibp(doc):
+            fp.write(block)
+
+    def write_document_ming_to(self, doc, fp):
+        '''Writes a single document to the file-like object `fp` block by
+        block.'''
+
+        for block in self.iter_document_ming(doc):
+            fp.write(block)
+
+    def iter_documents_ibp(self, docs):
+        '''Yields the message of every document in `docs` in order.'''
+
+        return self._map('ibp', docs)
+
+    def iter_documents_ming(self, docs):
+        '''Yields the message of every document in `docs` in order.'''
+
+        return self._map('ming', docs)
+
+    def write_documents_ibp_to(self, docs, fp):
+        '''Writes the messages of `docs` to the file-like object `fp` in
+        order, each as soon as it is ready.'''
+
+        for message in self.iter_documents_ibp(docs):
+            fp.write(message)
+
+    def write_documents_ming_to(self, docs, fp):
+        '''Writes the messages of `docs` to the file-like object `fp` in
+        order, each as soon as it is ready.'''
+
+        for message in self.iter_documents_ming(docs):
+            fp.write(message)
@@ -0,0 +1,558 @@
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from io import BytesIO
+import re
+
+from libmt94x.currency_codes import CurrencyCodes
+from libmt94x.document import Mt940Document
+from libmt94x.fields import AccountIdentification
+from libmt94x.fields import ClosingAvailableBalance
+from libmt94x.fields import ClosingBalance
+from libmt94x.fields import ExportInformation
+from libmt94x.fields import ForwardAvailableBalance
+from libmt94x.fields import ImportInformation
+from libmt94x.fields import InformationToAccountOwner
+from libmt94x.fields import InformationToAccountOwnerTotals
+from libmt94x.fields import OpeningBalance
+from libmt94x.fields import StatementLine
+from libmt94x.fields import StatementNumber
+from libmt94x.fields import TransactionReferenceNumber
+from libmt94x.info_acct_owner_subfields import InfoToAcccountOwnerSubFieldOrder
+from libmt94x.info_acct_owner_subfields import RemittanceInformation
+from libmt94x.remittance_info import DutchStructuredRemittanceInfo
+from libmt94x.remittance_info import IsoStructuredRemittanceInfo
+from libmt94x.remittance_info import UnstructuredRemittanceInfo
+from libmt94x.statement_line_subfields import OriginalAmountOfTransaction
+from libmt94x.textutil import to_minor_units
+
+
+def get_lines(source):
+    '''Accepts both a bytestring and anything that yields lines (like a file
+    object), without splitting a bytestring into a list of lines.'''
+
+    if isinstance(source, bytes):
+        return BytesIO(source)
+
+    return source
+
+
+class Mt94xTokenizer(object):
+    '''Splits a stream of lines into tokens. Only the lines of the current
+    field are kept in memory, so input of any size can be tokenized.'''
+
+    TOKEN_HEADER = 1
+    TOKEN_FIELD = 2
+    TOKEN_EPILOG = 3
+
+    rx_field = re.compile(r'^:(\d{2}[A-Z]?):')
+
+    epilogs = (b'-}', b'-XXX')
+
+    # What the first line of a message starts with, in either dialect
+    headers = (b'{1:', b'0000 ')
+
+    def tokenize(self, lines):
+        '''Yields tokens as tuples of (token type, tag, lines). Only field
+        tokens have a tag, and their lines exclude the tag itself.'''
+
+        tag = None
+        value_lines = []
+
+        for line in lines:
+            line = line.rstrip(b'\r\n')
+
+            while line:
+                # A message terminator, possibly followed by the header of the
+                # next message on the same line
+                epilog = self.match_epilog(line)
+                if epilog:
+                    if tag is not None:
+                        yield self.TOKEN_FIELD, tag, value_lines
+                        tag, value_lines = None, []
+
+                    yield self.TOKEN_EPILOG, None, [epilog]
+                    line = line[len(epilog):]
+                    continue
+
+                # The start of a new field
+                match = self.rx_field.match(line)
+                if match:
+                    if tag is not None:
+                        yield self.TOKEN_FIELD, tag, value_lines
+
+                    tag = match.group(1)
+                    value_lines = [line[match.end():]]
+
+                # A field that spans multiple lines
+                elif tag is not None:
+                    value_lines.append(line)
+
+                # Anything before the first field of a message
+                else:
+                    yield self.TOKEN_HEADER, None, [line]
+
+                break
+
+        if tag is not None:
+            yield self.TOKEN_FIELD, tag, value_lines
+
+    def match_epilog(self, line):
+        '''Returns the epilog `line` starts with, if the epilog is the whole
+        line or is followed by the header of the next message. A line of
+        free text that wraps onto an epilog is not the end of the message.'''
+
+        for epilog in self.epilogs:
+            if line.startswith(epilog):
+                rest = line[len(epilog):].rstrip(b'\r\n')
+                if not rest or rest.startswith(self.headers):
+                    return epilog
+
+        return None
+
+
+class Mt94xSplitter(object):
+    '''Splits a stream of lines into the messages it contains, by looking
+    only for message terminators. The fields themselves are not decoded.'''
+
+    def __init__(self):
+        self.tokenizer = Mt94xTokenizer()
+
+    def split(self, source):
+        '''Yields every message in `source` as a bytestring that can be passed
+        to Mt94xParser. `source` is either a bytestring or an iterable of lines
+        (such as a file object).'''
+
+        parts = []
+
+        for line in get_lines(source):
+            while line:
+                epilog = self.tokenizer.match_epilog(line)
+                if not epilog:
+                    parts.append(line)
+                    break
+
+                # Keep the line terminator with the message, unless the next
+                # message starts on the same line
+                rest = line[len(epilog):]
+                if rest.strip(b'\r\n'):
+                    parts.append(epilog)
+                    line = rest
+                else:
+                    parts.append(line)
+                    line = b''
+
+                yield b''.join(parts)
+                parts = []
+
+        # Let the parser report a message that is not terminated
+        message = b''.join(parts)
+        if message.strip():
+            yield message
+
+
+class Mt94xParser(object):
+    '''Reconstructs Mt940Document objects from the output of Mt94xWriter. The
+    input is consumed as a stream of lines and documents are produced one
+    message at a time, so a file containing many messages never has to be
+    held in memory as a whole.'''
+
+    rx_amount = r'(\d+,\d*)'
+
+    rx_balance = re.compile(
+        r'^([CD])(\d{6})([A-Z]{3})' + rx_amount + r'$')
+    rx_statement_line_ibp = re.compile(
+        r'^(\d{6})(\d{4})?([CD])' + rx_amount + r'N([A-Z0-9]{3})([^/]*)(/.*)?$')
+    rx_statement_line_ming = re.compile(
+        r'^(\d{6})(\d{4})?([CD])' + rx_amount + r'N([A-Z0-9]{3})([^/]*)(?://(.*))?$')
+    rx_supplementary_details = re.compile(
+        r'^/TRCD/([^/]*)/(?:/OCMT/([A-Z]{3})' + rx_amount + r'/)?$')
+    rx_totals_ibp = re.compile(
+        r'^D(\d+)C(\d+)D' + rx_amount + r'C' + rx_amount + r'$')
+    rx_totals_ming = re.compile(
+        r'SUM/(\d+)/(\d+)/' + rx_amount + r'/' + rx_amount + r'/')
+    rx_export_import_ibp = re.compile(r'^0000 01(.*)(.{5})$')
+
+    # tag -> class, the layout of the value is declared on the class
+    code_words = InfoToAcccountOwnerSubFieldOrder.fields_by_tag
+
+    # Matches the start of a code word, which is either the start of the value
+    # or directly follows the slash that terminates the previous code word
+    rx_code_word = re.compile(
+        r'(?:^|(?<=/))/(%s)/' % '|'.join(sorted(code_words)))
+
+    remittance_infos = tuple(
+        (remittance_cls.qualifier + b'/', remittance_cls)
+        for remittance_cls in (
+            UnstructuredRemittanceInfo,
+            DutchStructuredRemittanceInfo,
+            IsoStructuredRemittanceInfo,
+        )
+    )
+
+    def __init__(self, minor_units=False):
+        '''With `minor_units` amounts are returned as an int in minor units
+        (cents) instead of a Decimal.'''
+
+        self.minor_units = minor_units
+        self.tokenizer = Mt94xTokenizer()
+
+    # Helpers
+
+    def _match(self, rx, tag, value):
+        match = rx.match(value)
+        if not match:
+            raise ValueError("Malformed value for field :%s:: %s" % (tag, value))
+
+        return match
+
+    def parse_amount(self, value):
+        if self.minor_units:
+            whole, _, fraction = value.partition(b',')
+            if len(fraction) <= 2:
+                return int(whole + fraction.ljust(2, b'0'))
+
+            return to_minor_units(Decimal(value.replace(b',', b'.')))
+
+        return Decimal(value.replace(b',', b'.'))
+
+    def parse_date_yymmdd(self, value):
+        # NOTE: Follows the POSIX convention used by strptime for %y
+        year = int(value[0:2])
+        year += 2000 if year < 69 else 1900
+        return datetime(year, int(value[2:4]), int(value[4:6]))
+
+    def parse_date_mmdd(self, value, near_date):
+        '''The year is not part of the value, so we take the year of
+        `near_date`, accounting for a book date and value date that lie on
+        either side of the turn of the year.'''
+
+        month, day = int(value[0:2]), int(value[2:4])
+
+        year = near_date.year
+        if month - near_date.month > 6:
+            year -= 1
+        elif near_date.month - month > 6:
+            year += 1
+
+        return datetime(year, month, day)
+
+    def parse_type(self, cls, value):
+        return cls.TYPE_CREDIT if value == b'C' else cls.TYPE_DEBIT
+
+    def split_items(self, value, num_items, slash_index):
+        '''Splits a code word value into `num_items` items delimited by
+        slashes, where the item at `slash_index` may itself contain slashes.'''
+
+        if slash_index is None:
+            slash_index = num_items - 1
+
+        items = value.split(b'/', slash_index)
+        rest = items.pop() if len(items) > slash_index else b''
+
+        num_tail = num_items - slash_index - 1
+        if num_tail:
+            items.extend(rest.rsplit(b'/', num_tail))
+        else:
+            items.append(rest)
+
+        items.extend([b''] * (num_items - len(items)))
+        return items
+
+    # Fields
+
+    def parse_account_identification(self, value):
+        currency_codes = CurrencyCodes.get_instance()
+
+        iban, iso_currency_code = value, None
+        if len(value) > 3 and currency_codes.code_is_valid(value[-3:]):
+            iban, iso_currency_code = value[:-3], value[-3:]
+
+        return AccountIdentification(iban, iso_currency_code)
+
+    def parse_balance(self, cls, tag, value):
+        match = self._match(self.rx_balance, tag, value)
+        type, date, currency, amount = match.groups()
+
+        return cls(
+            self.parse_type(cls, type),
+            self.parse_date_yymmdd(date),
+            currency,
+            self.parse_amount(amount),
+        )
+
+    def parse_code_word(self, tag, value):
+        cls = self.code_words[tag]
+
+        if cls is RemittanceInformation:
+            for prefix, remittance_cls in self.remittance_infos:
+                if value.startswith(prefix):
+                    remittance_info = remittance_cls(value[len(prefix):])
+                    return RemittanceInformation(remittance_info=remittance_info)
+
+            # Some banks leave out the qualifier (as in REMI///<value>), or use
+            # one that is not known here. Such values are kept as unstructured
+            # remittance info rather than rejected.
+            if value.startswith(b'//'):
+                value = value[len(b'//'):]
+
+            return RemittanceInformation(remittance_info=UnstructuredRemittanceInfo(value))
+
+        attributes = [attribute for attribute, _, _ in cls.items]
+        slash_index = None
+        for idx, (_, _, slash_allowed) in enumerate(cls.items):
+            if slash_allowed:
+                slash_index = idx
+                break
+
+        items = self.split_items(value, len(attributes), slash_index)
+        kwargs = dict((attr, item or None) for attr, item in zip(attributes, items))
+
+        return cls(**kwargs)
+
+    def parse_code_words(self, value):
+        matches = list(self.rx_code_word.finditer(value))
+
+        code_words = []
+        for idx, match in enumerate(matches):
+            end = matches[idx + 1].start() if idx + 1 < len(matches) else len(value)
+
+            # Strip the slash that terminates the code word
+            item_value = value[match.end():end]
+            if item_value.endswith(b'/'):
+                item_value = item_value[:-1]
+
+            code_word = self.parse_code_word(match.group(1), item_value)
+            code_words.append(code_word)
+
+        return code_words
+
+    def parse_information_to_account_owner_ibp(self, value):
+        # The IBP dialect permits both the structured and the unstructured form
+        if self.rx_code_word.match(value):
+            return self.parse_information_to_account_owner_ming(value)
+
+        return InformationToAccountOwner(free_form_text=value)
+
+    def parse_information_to_account_owner_ming(self, value):
+        if value and not self.rx_code_word.match(value):
+            raise ValueError("Malformed value for field :86:: %s" % value)
+
+        return InformationToAccountOwner(code_words=self.parse_code_words(value))
+
+    def parse_information_to_account_owner_totals_ibp(self, value):
+        match = self._match(self.rx_totals_ibp, '86', value)
+        num_debit, num_credit, amount_debit, amount_credit = match.groups()
+
+        return InformationToAccountOwnerTotals(
+            int(num_debit),
+            int(num_credit),
+            self.parse_amount(amount_debit),
+            self.parse_amount(amount_credit),
+        )
+
+    def parse_information_to_account_owner_totals_ming(self, value):
+        match = self.rx_totals_ming.search(value)
+        if not match:
+            raise ValueError("Malformed value for field :86:: %s" % value)
+
+        num_debit, num_credit, amount_debit, amount_credit = match.groups()
+
+        return InformationToAccountOwnerTotals(
+            int(num_debit),
+            int(num_credit),
+            self.parse_amount(amount_debit),
+            self.parse_amount(amount_credit),
+        )
+
+    def parse_statement_line_ibp(self, lines):
+        '''NOTE: The writer does not delimit or pad the reference for the
+        account owner, so where it ends and the account servicing
+        institution's reference begins cannot be told. A value that fits in
+        16 bytes is taken as the reference for the account owner as a whole,
+        eg. EREF followed by ASIREF is read back as the reference EREFASIREF
+        without an account servicing institution's reference. The line is
+        written back the same either way.'''
+
+        value = b''.join(lines)
+
+        match = self._match(self.rx_statement_line_ibp, '61', value)
+        (value_date, book_date, type, amount, transaction_code, references,
+         supplementary_details) = match.groups()
+
+        value_date = self.parse_date_yymmdd(value_date)
+        if book_date is not None:
+            book_date = self.parse_date_mmdd(book_date, value_date)
+
+        # The reference for the account owner and the account servicing
+        # institution's reference are written without a delimiter, so only
+        # the bytes past the 16 of the former are known to be the latter
+        reference_for_account_owner = references[:16]
+        account_servicing_institutions_reference = references[16:] or None
+
+        ing_transaction_code = None
+        original_amount_of_transaction = None
+        if supplementary_details:
+            match = self._match(self.rx_supplementary_details, '61', supplementary_details)
+            ing_transaction_code, currency, original_amount = match.groups()
+
+            if currency is not None:
+                original_amount_of_transaction = OriginalAmountOfTransaction(
+                    currency, self.parse_amount(original_amount))
+
+        return StatementLine(
+            value_date=value_date,
+            book_date=book_date,
+            type=self.parse_type(StatementLine, type),
+            amount=self.parse_amount(amount),
+            transaction_code=transaction_code,
+            reference_for_account_owner=reference_for_account_owner,
+            ing_transaction_code=ing_transaction_code,
+            account_servicing_institutions_reference=account_servicing_institutions_reference,
+            original_amount_of_transaction=original_amount_of_transaction,
+        )
+
+    def parse_statement_line_ming(self, lines):
+        value, supplementary_details = lines[0], b''.join(lines[1:])
+
+        match = self._match(self.rx_statement_line_ming, '61', value)
+        (value_date, book_date, type, amount, transaction_code,
+         reference_for_account_owner, transaction_reference) = match.groups()
+
+        value_date = self.parse_date_yymmdd(value_date)
+        if book_date is not None:
+            book_date = self.parse_date_mmdd(book_date, value_date)
+
+        ing_transaction_code = None
+        if supplementary_details:
+            match = self._match(self.rx_supplementary_details, '61', supplementary_details)
+            ing_transaction_code = match.group(1)
+
+        return StatementLine(
+            value_date=value_date,
+            book_date=book_date,
+            type=self.parse_type(StatementLine, type),
+            amount=self.parse_amount(amount),
+            transaction_code=transaction_code,
+            reference_for_account_owner=reference_for_account_owner,
+            transaction_reference=transaction_reference,
+            ing_transaction_code=ing_transaction_code,
+        )
+
+    # Document
+
+    def _iter_documents(self, source, dialect):
+        tokens = self.tokenizer.tokenize(get_lines(source))
+
+        parse_statement_line = getattr(
+            self, 'parse_statement_line_%s' % dialect)
+        parse_info = getattr(
+            self, 'parse_information_to_account_owner_%s' % dialect)
+        parse_info_totals = getattr(
+            self, 'parse_information_to_account_owner_totals_%s' % dialect)
+
+        headers = []
+        fields = {}
+        entries = OrderedDict()
+        infos = None
+        forward_available_balances = []
+
+        for token_type, tag, lines in tokens:
+            if token_type == self.tokenizer.TOKEN_HEADER:
+                headers.extend(lines)
+                continue
+
+            if token_type == self.tokenizer.TOKEN_EPILOG:
+                yield self.build_document(
+                    dialect, headers, fields, entries, forward_available_balances)
+
+                headers = []
+                fields = {}
+                entries = OrderedDict()
+                infos = None
+                forward_available_balances = []
+                continue
+
+            value = b''.join(lines)
+
+            if tag == '20':
+                fields['transaction_reference_number'] = TransactionReferenceNumber(value)
+
+            elif tag == '25':
+                fields['account_identification'] = self.parse_account_identification(value)
+
+            elif tag == '28C':
+                fields['statement_number'] = StatementNumber(value)
+
+            elif tag == '60F':
+                fields['opening_balance'] = self.parse_balance(OpeningBalance, tag, value)
+
+            elif tag == '61':
+                statement_line = parse_statement_line(lines)
+                infos = entries[statement_line] = []
+
+            elif tag == '86' and 'closing_balance' in fields:
+                fields['info_to_acct_owner_totals'] = parse_info_totals(value)
+
+            elif tag == '86' and infos is not None:
+                infos.append(parse_info(value))
+
+            elif tag == '62F':
+                fields['closing_balance'] = self.parse_balance(ClosingBalance, tag, value)
+
+            elif tag == '64':
+                fields['closing_available_balance'] = self.parse_balance(
+                    ClosingAvailableBalance, tag, value)
+
+            elif tag == '65':
+                forward_available_balances.append(
+                    self.parse_balance(ForwardAvailableBalance, tag, value))
+
+            else:
+                raise ValueError("Unexpected field :%s: in document" % tag)
+
+        if headers or fields or entries:
+            raise ValueError("Document is not terminated")
+
+    def build_document(self, dialect, headers, fields, entries, forward_available_balances):
+        if dialect == 'ibp':
+            if len(headers) < 2:
+                raise ValueError("Document missing export_info or import_info")
+
+            match = self._match(self.rx_export_import_ibp, 'export_info', headers[0])
+            fields['export_info'] = ExportInformation(*match.groups())
+
+            match = self._match(self.rx_export_import_ibp, 'import_info', headers[1])
+            fields['import_info'] = ImportInformation(*match.groups())
+
+        return Mt940Document(
+            entries=entries,
+            forward_available_balances=forward_available_balances,
+            **fields
+        )
+
+    def iter_documents_ibp(self, source):
+        '''Yields a document for every message in `source`, which is either a
+        bytestring or an iterable of lines (such as a file object).'''
+
+        return self._iter_documents(source, 'ibp')
+
+    def iter_documents_ming(self, source):
+        '''Yields a document for every message in `source`, which is either a
+        bytestring or an iterable of lines (such as a file object).'''
+
+        return self._iter_documents(source, 'ming')
+
+    def parse_document_ibp(self, source):
+        docs = list(self.iter_documents_ibp(source))
+        if len(docs) != 1:
+            raise ValueError("Expected a single document, found: %s" % len(docs))
+
+        return docs[0]
+
+    def parse_document_ming(self, source):
+        docs = list(self.iter_documents_ming(source))
+        if len(docs) != 1:
+            raise ValueError("Expected a single document, found: %s" % len(docs))
+
+        return docs[0]
@@ -1,14 +1,35 @@
-class AbstractRemittanceInfo(object):
+from libmt94x.slotutil import SlotsPickleMixin
+
+
+class AbstractRemittanceInfo(SlotsPickleMixin):
     '''Abstract base class for all remittance info classes.'''
-    pass
+
+    __slots__ = ()
+
+    # Written in front of the value to identify the kind of remittance info
+    qualifier = None
+
+    # The attribute that holds the value
+    attribute = None
+
+    def get_value(self):
+        return getattr(self, self.attribute)
 
 
 class UnstructuredRemittanceInfo(AbstractRemittanceInfo):
+    qualifier = b'USTD/'
+    attribute = 'remittance_info'
+    __slots__ = ('remittance_info',)
+
     def __init__(self, remittance_info):
         self.remittance_info = remittance_info
 
 
 class DutchStructuredRemittanceInfo(AbstractRemittanceInfo):
+    qualifier = b'STRD/CUR'
+    attribute = 'payment_reference'
+    __slots__ = ('payment_reference',)
+
     def __init__(self, payment_reference):
         '''NL terms:
         - payment_reference - betalingskenmerk'''
@@ -17,5 +38,9 @@ class DutchStructuredRemittanceInfo(AbstractRemittanceInfo):
 
 
 class IsoStructuredRemittanceInfo(AbstractRemittanceInfo):
+    qualifier = b'STRD/ISO'
+    attribute = 'iso_reference'
+    __slots__ = ('iso_reference',)
+
     def __init__(self, iso_reference):
         self.iso_reference = iso_reference
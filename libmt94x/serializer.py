@@ -1,8 +1,10 @@
+from datetime import date
 from datetime import datetime
 from decimal import Decimal
 import re
 
 from libmt94x.textutil import format_amount
+from libmt94x.textutil import format_minor_units
 
 
 # NOTE: Module level binding since we want to use the name "type" in method
@@ -22,6 +24,8 @@ class Mt94xSerializer(object):
     )
     swift_charset_numbers = b"0123456789"
 
+    # NOTE: These patterns are no longer used for validation (see
+    # value_in_charset), but are kept for backwards compatibility.
     # Creates a pattern that must match the whole string where a byte can be
     # matched any number of times
     rx_chars = re.compile(
@@ -39,13 +43,25 @@ class Mt94xSerializer(object):
         '$'
     )
 
+    # The maximum number of formatted dates kept by serialize_day
+    date_cache_size = 4096
+
     def __init__(self, locale='nl_NL'):
         if locale not in ('nl_NL',):
             raise ValueError("Locale not implemented: %s" % locale)
 
         self.locale = locale
 
-        self._buffer = []
+        # (format, ordinal) -> bytes
+        self._date_cache = {}
+
+        # (maxlen, tag) -> bytes
+        self._tag_cache = {}
+
+        # The bytearray written into by the chaining API, if any
+        self._output = None
+
+        self.start()
 
 
     # Convenience properties
@@ -70,11 +86,13 @@ class Mt94xSerializer(object):
         if len(value) > maxlen:
             raise ValueError("Value cannot exceed %s bytes" % maxlen)
 
-        if type == self.TYPE_CHARACTER and not self.rx_chars.match(value):
+        if (type == self.TYPE_CHARACTER and
+                not self.value_in_charset(value, self.swift_charset_chars)):
             raise ValueError("Character string value can only contain the bytes: %s"
                              % self.swift_charset_chars)
 
-        if type == self.TYPE_NUMERIC and not self.rx_nums.match(value):
+        if (type == self.TYPE_NUMERIC and
+                not self.value_in_charset(value, self.swift_charset_numbers)):
             raise ValueError("Numeric value can only contain the bytes: %s"
                              % self.swift_charset_numbers)
 
@@ -83,21 +101,78 @@ class Mt94xSerializer(object):
 
         return value
 
+    def value_in_charset(self, value, charset):
+        # Deleting all the bytes of the charset from the value is a single
+        # pass over a 256-entry lookup table, after which only the bytes
+        # outside the charset remain
+        return not value.translate(None, charset)
+
+    def serialize_value_noslash(self, maxlen, value):
+        if '/' in value:
+            raise ValueError("Cannot use a slash here")
+
+        return self.serialize_value(self.TYPE_CHARACTER, maxlen, value)
+
+    def serialize_tag(self, maxlen, tag):
+        '''Serializes the tag of a field as ":tag:". There are only a few
+        tags, so each is validated once.'''
+
+        key = (maxlen, tag)
+
+        try:
+            return self._tag_cache[key]
+        except KeyError:
+            pass
+
+        bytes = self._tag_cache[key] = self.serialize_value(
+            self.TYPE_CHARACTER, maxlen, b':%s:' % tag)
+        return bytes
+
     def serialize_newline(self):
         return b'\r\n'
 
+    def serialize_wrapped(self, width, value):
+        # A line is only broken when more bytes follow, so a line of exactly
+        # `width` bytes that ends in a newline is not broken twice
+        if len(value) <= width:
+            return value
+
+        newline = self.serialize_newline()
+
+        lines = []
+        for line in value.split(newline):
+            if len(line) <= width:
+                lines.append(line)
+            else:
+                lines.extend([line[pos:pos + width]
+                              for pos in xrange(0, len(line), width)])
+
+        return newline.join(lines)
+
+    def format_amount(self, amount):
+        '''Formats a Decimal, or an int amount in minor units, without
+        validating it.'''
+
+        # FIXME: Decimal representation is currency and locale specific
+        if builtin_type(amount) is Decimal:
+            return format_amount(amount, self.locale)
+
+        return format_minor_units(amount, self.locale)
+
     def serialize_amount(self, maxlen, currency, amount):
-        if builtin_type(amount) is not Decimal:
-            raise ValueError("Must pass a Decimal")
+        '''Amounts are either a Decimal, or an int (or long) in minor units
+        (cents).'''
+
+        if builtin_type(amount) not in (Decimal, int, long):
+            raise ValueError("Must pass a Decimal or an int of minor units")
 
         # Amounts cannot have a negative sign
-        if amount < Decimal('0'):
+        if amount < 0:
             raise ValueError(
                 "Cannot serialize a negative amount, "
                 "did you forget to use TYPE_DEBIT?")
 
-        # FIXME: Decimal representation is currency and locale specific
-        bytes = format_amount(amount, self.locale)
+        bytes = self.format_amount(amount)
 
         # Now that we know how long the formatted bytestring is we can check
         # against maxlen
@@ -107,60 +182,222 @@ class Mt94xSerializer(object):
         return bytes
 
     def serialize_date(self, format, value):
-        if builtin_type(value) is not datetime:
-            raise ValueError("Must pass a datetime")
+        if builtin_type(value) not in (datetime, date):
+            raise ValueError("Must pass a date or datetime")
 
         return value.strftime(format)
 
+    def serialize_day(self, format, value):
+        '''Like serialize_date, but for a `format` that only uses the year,
+        month and day. A statement tends to contain only a handful of distinct
+        days, so the result is cached by day.'''
+
+        if builtin_type(value) not in (datetime, date):
+            raise ValueError("Must pass a date or datetime")
+
+        return self.format_day(format, value)
+
+    def format_day(self, format, value):
+        key = (format, value.toordinal())
+
+        try:
+            return self._date_cache[key]
+        except KeyError:
+            pass
+
+        # Keep the cache bounded, starting over is cheap
+        if len(self._date_cache) >= self.date_cache_size:
+            self._date_cache.clear()
+
+        bytes = self._date_cache[key] = value.strftime(format)
+        return bytes
+
 
     # Chaining API
 
+    def copy(self):
+        '''Returns a serializer with the same settings and caches as this one,
+        but which writes its own records, for use in another thread.'''
+
+        serializer = self.__class__.__new__(self.__class__)
+        serializer.__dict__.update(self.__dict__)
+
+        serializer._output = None
+        serializer.start()
+
+        return serializer
+
+    def set_output(self, output):
+        '''Makes the chaining API write every record into the bytearray
+        `output`, after the bytes already in it, instead of returning it from
+        finish(). This way the records of a document end up in a single buffer
+        without being joined. finish() returns None in this mode. Pass None to
+        return the records from finish() again.'''
+
+        self._output = output
+        self.start()
+
     def start(self):
-        self._buffer = []
+        if self._output is None:
+            self._buffer = []
+            self._append = self._buffer.append
+        else:
+            self._buffer = self._output
+            self._append = self._output.extend
+
+        # Where the record starts in the buffer
+        self._start = len(self._buffer)
+
+        # State of wrap()
+        self._width = None
+        self._wrap_start = None
+
         return self
 
     def finish(self):
-        bytes = b''.join(self._buffer)
-        self._buffer = []
+        if self._output is not None:
+            self._finish_output()
+            bytes = None
+
+        elif self._width is None:
+            bytes = b''.join(self._buffer)
+
+        else:
+            head = b''.join(self._buffer[:self._wrap_start])
+            body = b''.join(self._buffer[self._wrap_start:])
+            bytes = head + self.serialize_wrapped(self._width, body)
+
+        self.start()
         return bytes
 
+    def _finish_output(self):
+        # Only the wrapped part of the record is rewritten in place
+        if self._width is not None and self.wrapped_length > self._width:
+            body = bytes(self._output[self._wrap_start:])
+            del self._output[self._wrap_start:]
+            self._append(self.serialize_wrapped(self._width, body))
+
+    def emit(self, record):
+        '''Hands out a record that was serialized without the chaining API
+        like finish() does: returns it, or writes it to the output given to
+        set_output() and returns None.'''
+
+        if self._output is None:
+            return record
+
+        self._output.extend(record)
+        self.start()
+
+    def discard(self):
+        '''Drops everything appended since start().'''
+
+        if self._output is not None:
+            del self._output[self._start:]
+
+        self.start()
+
     def newline(self):
         bytes = self.serialize_newline()
-        self._buffer.append(bytes)
+        self._append(bytes)
         return self
 
+    def wrap(self, width):
+        '''Breaks the bytes appended from here until finish() into lines of
+        at most `width` bytes. The values appended before this call are not
+        counted.'''
+
+        self._width = width
+        self._wrap_start = len(self._buffer)
+        return self
+
+    @property
+    def wrapped_length(self):
+        '''The number of bytes appended since wrap(), not counting the line
+        breaks that will be inserted.'''
+
+        if self._output is not None:
+            return len(self._output) - self._wrap_start
+
+        return sum(len(bytes) for bytes in self._buffer[self._wrap_start:])
+
+    @property
+    def length(self):
+        '''The number of bytes appended since start(), not counting the line
+        breaks that will be inserted.'''
+
+        if self._output is not None:
+            return len(self._output) - self._start
+
+        return sum(len(bytes) for bytes in self._buffer)
+
     # Generic values
 
+    def raw(self, value):
+        '''Appends bytes that have already been serialized, like a constant
+        block that was validated up front.'''
+
+        self._append(value)
+        return self
+
+    def tag(self, maxlen, tag):
+        bytes = self.serialize_tag(maxlen, tag)
+        self._append(bytes)
+        return self
+
     def chars(self, maxlen, value):
         bytes = self.serialize_value(self.TYPE_CHARACTER, maxlen, value)
-        self._buffer.append(bytes)
+        self._append(bytes)
         return self
 
     def chars_noslash(self, maxlen, value):
-        if '/' in value:
-            raise ValueError("Cannot use a slash here")
-
-        return self.chars(maxlen, value)
+        bytes = self.serialize_value_noslash(maxlen, value)
+        self._append(bytes)
+        return self
 
     def num(self, maxlen, value, leading_zero=False):
         bytes = self.serialize_value(self.TYPE_NUMERIC, maxlen, value,
                                      leading_zeroes=maxlen if leading_zero else False)
-        self._buffer.append(bytes)
+        self._append(bytes)
         return self
 
     # Domain specific values
 
     def amount(self, maxlen, currency, amount):
         bytes = self.serialize_amount(maxlen, currency, amount)
-        self._buffer.append(bytes)
+        self._append(bytes)
         return self
 
     def date_yymmdd(self, date):
-        bytes = self.serialize_date('%y%m%d', date)
-        self._buffer.append(bytes)
+        bytes = self.serialize_day('%y%m%d', date)
+        self._append(bytes)
         return self
 
     def date_mmdd(self, date):
-        bytes = self.serialize_date('%m%d', date)
-        self._buffer.append(bytes)
+        bytes = self.serialize_day('%m%d', date)
+        self._append(bytes)
         return self
+
+
+class TrustedMt94xSerializer(Mt94xSerializer):
+    '''A serializer that does not validate the type, length or charset of the
+    values it is given. Only use this for data that has already been validated
+    (eg. with CharsetHelper.coerce and length checks), since invalid data will
+    be written as-is. Mt94xSerializer is the safe default.'''
+
+    def serialize_value(self, type, maxlen, value, leading_zeroes=0):
+        if type == self.TYPE_NUMERIC and leading_zeroes:
+            value = value.zfill(leading_zeroes)
+
+        return value
+
+    def serialize_amount(self, maxlen, currency, amount):
+        return self.format_amount(amount)
+
+    def serialize_date(self, format, value):
+        return value.strftime(format)
+
+    def serialize_day(self, format, value):
+        return self.format_day(format, value)
+
+    def serialize_value_noslash(self, maxlen, value):
+        return value
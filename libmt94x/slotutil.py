@@ -0,0 +1,36 @@
+# class -> the names of the slots of the class and its bases
+_slots_by_class = {}
+
+
+class SlotsPickleMixin(object):
+    '''Makes classes with __slots__ picklable with every pickle protocol.
+    Without it protocols 0 and 1 refuse objects that have no __dict__.'''
+
+    __slots__ = ()
+
+    def _get_slots(self):
+        cls = type(self)
+
+        try:
+            return _slots_by_class[cls]
+        except KeyError:
+            pass
+
+        slots = _slots_by_class[cls] = tuple(
+            slot
+            for klass in cls.__mro__
+            for slot in klass.__dict__.get('__slots__', ())
+        )
+        return slots
+
+    def __getstate__(self):
+        state = {}
+        for slot in self._get_slots():
+            if hasattr(self, slot):
+                state[slot] = getattr(self, slot)
+
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
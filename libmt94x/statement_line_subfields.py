@@ -1,21 +1,26 @@
 from decimal import Decimal
 
 from libmt94x.currency_codes import CurrencyCodes
+from libmt94x.slotutil import SlotsPickleMixin
 
 
-class StatementLineSubField(object):
+class StatementLineSubField(SlotsPickleMixin):
     '''Abstract base class for all subfields of StatementLine'''
-    pass
+
+    __slots__ = ()
 
 
 class OriginalAmountOfTransaction(StatementLineSubField):
+    __slots__ = ('currency', 'amount')
+
     def __init__(self, currency, amount):
         currency_codes = CurrencyCodes.get_instance()
         if not currency_codes.code_is_valid(currency):
             raise ValueError("Value `currency` is invalid: %s" % currency)
 
-        if not type(amount) == Decimal:
-            raise ValueError("The `amount` value must be a Decimal")
+        # Either a Decimal, or an int (or long) in minor units (cents)
+        if type(amount) not in (Decimal, int, long):
+            raise ValueError("The `amount` value must be a Decimal or an int of minor units")
 
         self.currency = currency
         self.amount = amount
@@ -0,0 +1,52 @@
+from collections import defaultdict
+import threading
+
+
+class WriterStats(object):
+    '''Collects the number of calls, the bytes emitted and the cumulative time
+    per write_* method and per code word class of a Mt94xWriter:
+
+        stats = WriterStats()
+        writer = Mt94xWriter(Mt94xSerializer(), stats=stats)
+        writer.write_document_ming(doc)
+        print(stats.format_report())
+
+    The writer only calls record(), so any object with a method of the same
+    signature can be passed instead to forward the measurements elsewhere.'''
+
+    def __init__(self):
+        # A writer, and so its stats, can be shared between threads
+        self._lock = threading.Lock()
+
+        # name -> total
+        self.calls = defaultdict(int)
+        self.bytes = defaultdict(int)
+        self.seconds = defaultdict(float)
+
+    def record(self, name, num_bytes, seconds):
+        with self._lock:
+            self.calls[name] += 1
+            self.bytes[name] += num_bytes
+            self.seconds[name] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.bytes.clear()
+            self.seconds.clear()
+
+    def get_rows(self):
+        '''Returns (name, calls, bytes, seconds) tuples, most expensive
+        first.'''
+
+        rows = [(name, self.calls[name], self.bytes[name], self.seconds[name])
+                for name in self.calls]
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def format_report(self):
+        lines = ['%-50s %10s %12s %10s' % ('name', 'calls', 'bytes', 'seconds')]
+        for name, calls, num_bytes, seconds in self.get_rows():
+            lines.append('%-50s %10d %12d %10.3f' % (name, calls, num_bytes, seconds))
+
+        return '\n'.join(lines)
@@ -1,3 +1,10 @@
+from decimal import Decimal
+
+
+# Amounts are written with two decimal places
+CENTS = Decimal('0.01')
+
+
 def break_at_width(text, width=None, newline=None):
     width = width or 65
     newline = newline or '\r\n'
@@ -31,10 +38,84 @@ def break_at_width(text, width=None, newline=None):
 
     return block
 
+def to_minor_units(amount):
+    '''Converts a Decimal to an integer amount in minor units (cents),
+    rounding half to even.'''
+
+    bytes = str(amount)
+
+    # Exponent notation (and NaN or Infinity, which raise)
+    if b'E' in bytes or not bytes[-1:].isdigit():
+        return int(amount.quantize(CENTS) * 100)
+
+    negative = bytes.startswith(b'-')
+    if negative:
+        bytes = bytes[1:]
+
+    whole, _, fraction = bytes.partition(b'.')
+    value = int(whole + fraction)
+
+    places = len(fraction)
+    if places <= 2:
+        units = value * 10 ** (2 - places)
+
+    else:
+        divisor = 10 ** (places - 2)
+        units, remainder = divmod(value, divisor)
+        if remainder * 2 > divisor or (remainder * 2 == divisor and units % 2):
+            units += 1
+
+    return -units if negative else units
+
+def format_decimal_nl(amount):
+    # str() is exact and already gives the plain notation with two decimal
+    # places for most amounts
+    bytes = str(amount)
+    if bytes[-3:-2] == b'.':
+        return bytes.replace(b'.', b',')
+
+    # Whole amounts
+    if bytes.isdigit():
+        return bytes + b',00'
+
+    return format_minor_units_nl(to_minor_units(amount))
+
+def format_minor_units_nl(units):
+    if units < 0:
+        return b'-%d,%02d' % divmod(-units, 100)
+
+    return b'%d,%02d' % divmod(units, 100)
+
 def format_amount(amount, locale):
+    '''Formats a Decimal exactly, rounding half to even beyond two decimal
+    places. Other numbers are formatted through float.'''
+
     if locale == 'nl_NL':
+        if type(amount) is Decimal:
+            return format_decimal_nl(amount)
+
         bytes = b'%.2f' % amount
         bytes = bytes.replace('.', ',')
         return bytes
 
     raise NotImplementedError
+
+def format_amounts(amounts, locale, minor_units=False):
+    '''Formats a sequence of Decimals, or of integer amounts in minor units
+    (cents) if `minor_units` is set, and returns a list of bytestrings.'''
+
+    if locale == 'nl_NL':
+        if minor_units:
+            return [format_minor_units_nl(units) for units in amounts]
+
+        return [format_decimal_nl(amount) for amount in amounts]
+
+    raise NotImplementedError
+
+def format_minor_units(units, locale):
+    '''Formats an integer amount in minor units (cents).'''
+
+    if locale == 'nl_NL':
+        return format_minor_units_nl(units)
+
+    raise NotImplementedError
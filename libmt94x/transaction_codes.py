@@ -245,11 +245,7 @@ class IngTransactionCodes(AbstractTransactionCodes):
     }
 
     def code_is_valid(self, code):
-        try:
-            self.resolve_code(code)
-            return True
-        except InvalidIngTransactionCodeError:
-            return False
+        return code in self.codes
 
     def resolve_code(self, code):
         try:
@@ -411,11 +407,7 @@ class SwiftTransactionCodes(AbstractTransactionCodes):
     }
 
     def code_is_valid(self, code):
-        try:
-            self.resolve_code(code)
-            return True
-        except InvalidSwiftTransactionCodeError:
-            return False
+        return code in self.codes
 
     def resolve_code(self, code):
         try:
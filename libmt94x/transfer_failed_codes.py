@@ -20,11 +20,7 @@ class AbstractTransferFailed(object):
         return cls.instance
 
     def code_is_valid(self, code):
-        try:
-            self.resolve_code(code)
-            return True
-        except InvalidTransferFailedCodeError:
-            return False
+        return code in self.codes
 
     def resolve_code(self, code):
         try:
@@ -123,15 +119,10 @@ class TransferFailed(AbstractTransferFailed):
     '''Convenience class that collects all possible transfer failed codes and
     provides a matching API.'''
 
+    # Merged table of all codes, where SEPA takes precedence
+    codes = dict(TransferFailedMisc.codes)
+    codes.update(TransferFailedSEPA.codes)
+
     def __init__(self):
         self.sepa = TransferFailedSEPA.get_instance()
         self.misc = TransferFailedMisc.get_instance()
-
-    def code_is_valid(self, code):
-        return self.sepa.code_is_valid(code) or self.misc.code_is_valid(code)
-
-    def resolve_code(self, code):
-        try:
-            return self.sepa.resolve_code(code)
-        except InvalidTransferFailedCodeError:
-            return self.misc.resolve_code(code)
@@ -1,160 +1,124 @@
-from libmt94x.info_acct_owner_subfields import BeneficiaryParty
-from libmt94x.info_acct_owner_subfields import BusinessPurpose
-from libmt94x.info_acct_owner_subfields import Charges
-from libmt94x.info_acct_owner_subfields import ClientReference
-from libmt94x.info_acct_owner_subfields import CounterPartyID
-from libmt94x.info_acct_owner_subfields import CounterPartyIdentification
-from libmt94x.info_acct_owner_subfields import CreditorID
-from libmt94x.info_acct_owner_subfields import EndToEndReference
-from libmt94x.info_acct_owner_subfields import ExchangeRate
-from libmt94x.info_acct_owner_subfields import InstructionID
-from libmt94x.info_acct_owner_subfields import InfoToAcccountOwnerSubFieldOrder
-from libmt94x.info_acct_owner_subfields import MandateReference
-from libmt94x.info_acct_owner_subfields import OrderingParty
-from libmt94x.info_acct_owner_subfields import PaymentInformationID
-from libmt94x.info_acct_owner_subfields import PurposeCode
-from libmt94x.info_acct_owner_subfields import RemittanceInformation
-from libmt94x.info_acct_owner_subfields import ReturnReason
-from libmt94x.info_acct_owner_subfields import UltimateBeneficiary
-from libmt94x.info_acct_owner_subfields import UltimateCreditor
-from libmt94x.info_acct_owner_subfields import UltimateDebtor
-from libmt94x.remittance_info import DutchStructuredRemittanceInfo
-from libmt94x.remittance_info import IsoStructuredRemittanceInfo
-from libmt94x.remittance_info import UnstructuredRemittanceInfo
-from libmt94x.textutil import break_at_width
-from libmt94x.textutil import format_amount
+import threading
+import timeit
 
 
 class Mt94xWriter(object):
-    def __init__(self, serializer):
-        self.serializer = serializer
-
-    def _write_code_word(self, serializer, code_word):
-        serializer.chars(5, b'/%s' % code_word.tag)
-
-        if isinstance(code_word, BeneficiaryParty):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.account_number if code_word.account_number else '')
-
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(11, code_word.bic if code_word.bic else '')
-
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(50, code_word.name if code_word.name else '')
-
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.city if code_word.city else '')
+    # The number of bytes collected before write_document_*_to writes them out
+    output_block_size = 64 * 1024
 
-        elif isinstance(code_word, BusinessPurpose):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(24, code_word.id_code if code_word.id_code else '')
-
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(9, (code_word.sepa_transaction_type if
-                                         code_word.sepa_transaction_type else ''))
-
-        elif isinstance(code_word, Charges):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(15, code_word.charges)
-
-        elif isinstance(code_word, ClientReference):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.client_reference)
-
-        elif isinstance(code_word, CounterPartyID):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.account_number if code_word.account_number else '')
-
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(11, code_word.bic if code_word.bic else '')
-
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(50, code_word.name if code_word.name else '')
-
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.city if code_word.city else '')
-
-        elif isinstance(code_word, CounterPartyIdentification):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.id_code if code_word.id_code else '')
+    def __init__(self, serializer, stats=None):
+        self.serializer = serializer
+        self.stats = stats
+
+        # The constant blocks are validated once, here
+        self._message_information_ibp = self._make_block(6, b'940 00', newline=True)
+        self._info_prefix_ibp = self._make_block(7, b'0000 01')
+        self._epilog_ibp = self._make_block(4, b'-XXX')
+        self._export_info_ming = self._make_block(29, b'{1:F01INGBNL2ABXXX0000000000}', newline=True)
+        self._import_info_ming = self._make_block(20, b'{2:I940INGBNL2AXXXN}', newline=True)
+        self._prolog_ming = self._make_block(3, b'{4:', newline=True)
+        self._epilog_ming = self._make_block(2, b'-}')
+
+        # Without stats the methods are not wrapped at all, so there is no
+        # overhead unless it is asked for
+        if stats is not None:
+            self._instrument(stats)
+
+    # Serializer
+
+    @property
+    def serializer(self):
+        '''The serializer of the calling thread. A serializer holds the record
+        being written, so every thread other than the one that set it gets its
+        own copy, which shares the caches. That way a single writer can be
+        used from many threads.'''
+
+        try:
+            return self._local.serializer
+        except AttributeError:
+            serializer = self._local.serializer = self._serializer.copy()
+            return serializer
+
+    @serializer.setter
+    def serializer(self, serializer):
+        self._serializer = serializer
+        self._local = threading.local()
+        self._local.serializer = serializer
+
+    def _make_block(self, maxlen, value, newline=False):
+        block = self.serializer.serialize_value(
+            self.serializer.TYPE_CHARACTER, maxlen, value)
+
+        if newline:
+            block += self.serializer.serialize_newline()
 
-        elif isinstance(code_word, CreditorID):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.creditor_id if code_word.creditor_id else '')
+        return block
 
-        elif isinstance(code_word, EndToEndReference):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, (code_word.end_to_end_reference
-                                          if code_word.end_to_end_reference else ''))
+    # Instrumentation
 
-        elif isinstance(code_word, ExchangeRate):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(12, code_word.exchange_rate)
+    def _instrument(self, stats):
+        '''Wraps the write_* methods and _write_code_word of this instance to
+        report every call to `stats` (see libmt94x.stats.WriterStats). The
+        time of a method includes the time of the methods it calls.'''
 
-        elif isinstance(code_word, InstructionID):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.instruction_id)
+        for name in dir(self):
+            if name.startswith('write_'):
+                setattr(self, name, self._timed_method(stats, name, getattr(self, name)))
 
-        elif isinstance(code_word, MandateReference):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.mandate_reference)
+        self._write_code_word = self._timed_code_word(stats, self._write_code_word)
 
-        elif isinstance(code_word, OrderingParty):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.account_number if code_word.account_number else '')
+    def _timed_method(self, stats, name, method):
+        timer = timeit.default_timer
 
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(11, code_word.bic if code_word.bic else '')
+        def timed_method(*args, **kwargs):
+            # When the serializer writes into an output the records are not
+            # returned, so the bytes are counted in the output instead
+            output = self.serializer._output
+            length = len(output) if output is not None else 0
 
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(50, code_word.name if code_word.name else '')
+            start = timer()
+            result = method(*args, **kwargs)
+            elapsed = timer() - start
 
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.city if code_word.city else '')
+            if result is None:
+                num_bytes = len(output) - length if output is not None else 0
+            elif isinstance(result, (int, long)):
+                num_bytes = result
+            else:
+                num_bytes = len(result)
 
-        elif isinstance(code_word, PaymentInformationID):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.payment_information_id)
+            stats.record(name, num_bytes, elapsed)
+            return result
 
-        elif isinstance(code_word, PurposeCode):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(4, code_word.purpose_of_collection)
+        return timed_method
 
-        elif isinstance(code_word, RemittanceInformation):
-            # We allow slashes in this subfield
-            if isinstance(code_word.remittance_info, UnstructuredRemittanceInfo):
-                serializer.chars(255, b'/USTD//%s'
-                                 % code_word.remittance_info.remittance_info)
+    def _timed_code_word(self, stats, method):
+        timer = timeit.default_timer
 
-            elif isinstance(code_word.remittance_info, DutchStructuredRemittanceInfo):
-                serializer.chars(255, b'/STRD/CUR/%s'
-                                 % code_word.remittance_info.payment_reference)
+        def timed_code_word(serializer, code_word):
+            length = serializer.length
+            start = timer()
+            method(serializer, code_word)
+            elapsed = timer() - start
 
-            elif isinstance(code_word.remittance_info, IsoStructuredRemittanceInfo):
-                serializer.chars(255, b'/STRD/ISO/%s'
-                                 % code_word.remittance_info.iso_reference)
+            stats.record(code_word.__class__.__name__, serializer.length - length, elapsed)
 
-        elif isinstance(code_word, ReturnReason):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(4, code_word.reason_code)
+        return timed_code_word
 
-        elif isinstance(code_word, UltimateBeneficiary):
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.name)
+    # Code words
 
-        elif isinstance(code_word, UltimateCreditor):
-            serializer.chars(1, b'/')
-            serializer.chars(70, code_word.name if code_word.name else '')  # allow slash
-
-            serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.id if code_word.id else '')
+    def _write_code_word(self, serializer, code_word):
+        serializer.chars(5, b'/%s' % code_word.tag)
 
-        elif isinstance(code_word, UltimateDebtor):
-            serializer.chars(1, b'/')
-            serializer.chars(70, code_word.name if code_word.name else '')  # allow slash
+        # The layout is declared on the subfield class
+        for attribute, maxlen, slash_allowed in code_word.items:
+            value = getattr(code_word, attribute)
 
             serializer.chars(1, b'/')
-            serializer.chars_noslash(35, code_word.id if code_word.id else '')
+            if slash_allowed:
+                serializer.chars(maxlen, value if value else '')
+            else:
+                serializer.chars_noslash(maxlen, value if value else '')
 
         serializer.chars(1, b'/')
 
@@ -163,7 +127,7 @@ class Mt94xWriter(object):
     def write_account_identification(self, ai):
         record = (self.serializer
             .start()
-            .chars(4, b':%s:' % ai.tag)
+            .tag(4, ai.tag)
             .chars(35, b'%s%s' % (ai.iban, (ai.iso_currency_code if
                                             ai.iso_currency_code else '')))
             .newline()
@@ -174,7 +138,7 @@ class Mt94xWriter(object):
     def write_closing_available_balance(self, cab):
         record = (self.serializer
             .start()
-            .chars(4, b':%s:' % cab.tag)
+            .tag(4, cab.tag)
             .chars(1, b'C' if cab.type == cab.TYPE_CREDIT else b'D')
             .date_yymmdd(cab.date)
             .chars(3, cab.currency)
@@ -187,7 +151,7 @@ class Mt94xWriter(object):
     def write_closing_balance(self, cb):
         record = (self.serializer
             .start()
-            .chars(5, b':%s:' % cb.tag)
+            .tag(5, cb.tag)
             .chars(1, b'C' if cb.type == cb.TYPE_CREDIT else b'D')
             .date_yymmdd(cb.date)
             .chars(3, cb.currency)
@@ -200,7 +164,7 @@ class Mt94xWriter(object):
     def write_forward_available_balance(self, fab):
         record = (self.serializer
             .start()
-            .chars(4, b':%s:' % fab.tag)
+            .tag(4, fab.tag)
             .chars(1, b'C' if fab.type == fab.TYPE_CREDIT else b'D')
             .date_yymmdd(fab.date)
             .chars(3, fab.currency)
@@ -212,75 +176,65 @@ class Mt94xWriter(object):
 
     def write_information_to_account_owner_ibp(self, info):
         maxlen = 6 * 65
+        serializer = self.serializer
 
-        # Write out the tag
-        (self.serializer
-            .start())
+        # Write out the tag, which is not counted when breaking lines
+        (serializer
+            .start()
+            .tag(5, info.tag)
+            .wrap(65))
 
         # Write out all the subfields (order is undefined)
         for code_word in info.code_words:
-            self._write_code_word(self.serializer, code_word)
+            self._write_code_word(serializer, code_word)
 
         # Write out the free form text (note that this excludes subfields above)
         if info.free_form_text:
-            self.serializer.chars(maxlen, info.free_form_text)
+            serializer.chars(maxlen, info.free_form_text)
 
         # Terminate the value
-        info_part = (self.serializer
-            .newline()
-            .finish())
+        serializer.newline()
 
         # Check max length (note that this applies to the info part only, not
         # the whole record)
-        if len(info_part) > maxlen:
+        if serializer.wrapped_length > maxlen:
+            serializer.discard()
             raise ValueError("Record exceeds maximum length: %s" % maxlen)
 
-        # Break lines at character 65
-        info_part = break_at_width(info_part, width=65, newline='\r\n')
-
-        # Write out the tag
-        tag_part = (self.serializer
-            .start()
-            .chars(5, b':%s:' % info.tag)
-            .finish())
-
-        # Concat tag and info part
-        record = b'%s%s' % (tag_part, info_part)
+        record = serializer.finish()
 
         return record
 
     def write_information_to_account_owner_ming(self, info):
         maxlen = 6 * 65
+        serializer = self.serializer
 
         # Write out the tag
-        (self.serializer
+        (serializer
             .start()
-            .chars(5, b':%s:' % info.tag))
+            .wrap(65)
+            .tag(5, info.tag))
 
         # Write out all the subfields (order is defined)
-        for code_word_cls in InfoToAcccountOwnerSubFieldOrder.get_field_classes():
-            code_word = info.get_code_word_by_cls(code_word_cls)
-            if code_word is not None:
-                self._write_code_word(self.serializer, code_word)
+        for code_word in info.get_ordered_code_words():
+            self._write_code_word(serializer, code_word)
 
         # Terminate the record
-        record = (self.serializer
-            .newline()
-            .finish())
+        serializer.newline()
 
         # Check max length
-        if len(record) > maxlen:
+        if serializer.wrapped_length > maxlen:
+            serializer.discard()
             raise ValueError("Record exceeds maximum length: %s" % maxlen)
 
-        # Break lines at character 65
-        record = break_at_width(record, width=65, newline='\r\n')
+        record = serializer.finish()
 
         return record
 
     def write_information_to_account_owner_totals_ibp(self, info):
         record = (self.serializer
             .start()
-            .chars(5, b':%s:' % info.tag)
+            .tag(5, info.tag)
             .chars(1, b'D')
             .num(6, b'%s' % info.num_debit, leading_zero=True)
             .chars(1, b'C')
@@ -297,7 +251,7 @@ class Mt94xWriter(object):
     def write_information_to_account_owner_totals_ming(self, info):
         record = (self.serializer
             .start()
-            .chars(5, b':%s:' % info.tag)
+            .tag(5, info.tag)
             .chars(5, b'/SUM/')
             .num(6, b'%s' % info.num_debit)
             .chars(1, b'/')
@@ -315,7 +269,7 @@ class Mt94xWriter(object):
     def write_opening_balance(self, ob):
         record = (self.serializer
             .start()
-            .chars(5, b':%s:' % ob.tag)
+            .tag(5, ob.tag)
             .chars(1, b'C' if ob.type == ob.TYPE_CREDIT else b'D')
             .date_yymmdd(ob.date)
             .chars(3, ob.currency)
@@ -325,22 +279,27 @@ class Mt94xWriter(object):
         )
         return record
 
-    def write_statement_line_ibp(self, sl):
+    def _get_supplementary_details_ibp(self, sl):
         supplementary_details = b''
         if sl.ing_transaction_code:
             supplementary_details = b'/TRCD/%s/' % sl.ing_transaction_code
             if sl.original_amount_of_transaction:
-                amount = format_amount(sl.original_amount_of_transaction.amount,
-                                       self.serializer.locale)
+                amount = self.serializer.format_amount(
+                    sl.original_amount_of_transaction.amount)
                 supplementary_details = b'%s/OCMT/%s%s/' % (
                     supplementary_details,
                     sl.original_amount_of_transaction.currency,
                     amount,
                 )
 
+        return supplementary_details
+
+    def write_statement_line_ibp(self, sl):
+        supplementary_details = self._get_supplementary_details_ibp(sl)
+
         record = (self.serializer
             .start()
-            .chars(4, b':%s:' % sl.tag)
+            .tag(4, sl.tag)
             .date_yymmdd(sl.value_date)
             .chars(1, b'C' if sl.type == sl.TYPE_CREDIT else b'D')
             .amount(15, None, sl.amount)
@@ -358,7 +317,7 @@ class Mt94xWriter(object):
     def write_statement_line_ming(self, sl):
         record = (self.serializer
             .start()
-            .chars(4, b':%s:' % sl.tag)
+            .tag(4, sl.tag)
             .date_yymmdd(sl.value_date)
             .date_mmdd(sl.book_date)
             .chars(1, b'C' if sl.type == sl.TYPE_CREDIT else b'D')
@@ -376,7 +335,7 @@ class Mt94xWriter(object):
     def write_statement_number(self, sn):
         record = (self.serializer
             .start()
-            .chars(5, b':%s:' % sn.tag)
+            .tag(5, sn.tag)
             .num(5, sn.statement_number)
             .newline()
             .finish()
@@ -386,7 +345,7 @@ class Mt94xWriter(object):
     def write_transaction_reference_number_ibp(self, trn):
         record = (self.serializer
             .start()
-            .chars(4, b':%s:' % trn.tag)
+            .tag(4, trn.tag)
             .chars(16, b'ING')
             .newline()
             .finish()
@@ -396,7 +355,7 @@ class Mt94xWriter(object):
     def write_transaction_reference_number_ming(self, trn):
         record = (self.serializer
             .start()
-            .chars(4, b':%s:' % trn.tag)
+            .tag(4, trn.tag)
             .chars(16, trn.transaction_reference_number)
             .newline()
             .finish()
@@ -408,30 +367,28 @@ class Mt94xWriter(object):
     def write_message_information_ibp(self):
         block = (self.serializer
             .start()
-            .chars(6, b'940 00')
-            .newline()
+            .raw(self._message_information_ibp)
             .finish())
         return block
 
     def write_prolog_ming(self):
         block = (self.serializer
             .start()
-            .chars(3, b'{4:')
-            .newline()
+            .raw(self._prolog_ming)
             .finish())
         return block
 
     def write_epilog_ibp(self):
         block = (self.serializer
             .start()
-            .chars(4, b'-XXX')
+            .raw(self._epilog_ibp)
             .finish())
         return block
 
     def write_epilog_ming(self):
         block = (self.serializer
             .start()
-            .chars(2, b'-}')
+            .raw(self._epilog_ming)
             .finish())
         return block
 
@@ -439,9 +396,7 @@ class Mt94xWriter(object):
         # Some of these values are constants
         block = (self.serializer
             .start()
-            .chars(4, b'0000')
-            .chars(1, b' ')
-            .chars(2, b'01')
+            .raw(self._info_prefix_ibp)
             .chars(12, info.export_address)
             .chars(5, info.export_number)
             .newline()
@@ -452,8 +407,7 @@ class Mt94xWriter(object):
         # NOTE: This appears to be a constant value
         block = (self.serializer
             .start()
-            .chars(29, b'{1:F01INGBNL2ABXXX0000000000}')
-            .newline()
+            .raw(self._export_info_ming)
             .finish())
         return block
 
@@ -461,9 +415,7 @@ class Mt94xWriter(object):
         # Some of these values are constants
         block = (self.serializer
             .start()
-            .chars(4, b'0000')
-            .chars(1, b' ')
-            .chars(2, b'01')
+            .raw(self._info_prefix_ibp)
             .chars(12, info.import_address)
             .chars(5, info.import_number)
             .newline()
@@ -474,145 +426,272 @@ class Mt94xWriter(object):
         # NOTE: This appears to be a constant value
         block = (self.serializer
             .start()
-            .chars(20, b'{2:I940INGBNL2AXXXN}')
-            .newline()
+            .raw(self._import_info_ming)
             .finish())
         return block
 
     # Document
 
-    def write_document_ibp(self, doc):
-        blocks = []
+    def iter_document_ibp(self, doc):
+        '''Yields the records of the document one at a time, so that only a
+        single record needs to be held in memory.'''
+
+        for record in self.iter_header_ibp(doc):
+            yield record
+
+        for record in self.iter_entries_ibp(doc.iter_entries()):
+            yield record
+
+        for record in self.iter_trailer_ibp(doc):
+            yield record
+
+    def iter_header_ibp(self, doc):
+        '''Yields the records that come before the entries.'''
 
         # export info
         if doc.export_info is None:
             raise ValueError("Document missing export_info")
 
-        export = self.write_export_info_ibp(doc.export_info)
-        blocks.append(export)
+        yield self.write_export_info_ibp(doc.export_info)
 
         # import info
         if doc.import_info is None:
             raise ValueError("Document missing import_info")
 
-        import_ = self.write_import_info_ibp(doc.import_info)
-        blocks.append(import_)
+        yield self.write_import_info_ibp(doc.import_info)
 
         # 940 00
-        prolog = self.write_message_information_ibp()
-        blocks.append(prolog)
+        yield self.write_message_information_ibp()
 
         # :20:
-        trn = self.write_transaction_reference_number_ibp(
+        yield self.write_transaction_reference_number_ibp(
             doc.transaction_reference_number)
-        blocks.append(trn)
 
         # :25:
-        ai = self.write_account_identification(doc.account_identification)
-        blocks.append(ai)
+        yield self.write_account_identification(doc.account_identification)
 
         # :28C:
-        sn = self.write_statement_number(doc.statement_number)
-        blocks.append(sn)
+        yield self.write_statement_number(doc.statement_number)
 
         # :60F:
-        ob = self.write_opening_balance(doc.opening_balance)
-        blocks.append(ob)
+        yield self.write_opening_balance(doc.opening_balance)
+
+    def iter_entries_ibp(self, entries):
+        '''Yields the records of `entries`, an iterable of (statement line,
+        infos) pairs like Mt940Document.iter_entries().'''
 
         # entries: :61: & :86:
-        for statement_line, infos in doc.entries.items():
-            sl = self.write_statement_line_ibp(statement_line)
-            blocks.append(sl)
+        for statement_line, infos in entries:
+            yield self.write_statement_line_ibp(statement_line)
             for info in infos:
-                inf = self.write_information_to_account_owner_ibp(info)
-                blocks.append(inf)
+                yield self.write_information_to_account_owner_ibp(info)
+
+    def iter_trailer_ibp(self, doc):
+        '''Yields the records that come after the entries.'''
 
         # :62F:
-        cb = self.write_closing_balance(doc.closing_balance)
-        blocks.append(cb)
+        yield self.write_closing_balance(doc.closing_balance)
 
         # :64:
-        cab = self.write_closing_available_balance(doc.closing_available_balance)
-        blocks.append(cab)
+        yield self.write_closing_available_balance(doc.closing_available_balance)
 
         # :65:
         for forward_available_balance in doc.forward_available_balances:
-            fab = self.write_forward_available_balance(forward_available_balance)
-            blocks.append(fab)
+            yield self.write_forward_available_balance(forward_available_balance)
 
         # :86:
-        info_tot = self.write_information_to_account_owner_totals_ibp(
+        yield self.write_information_to_account_owner_totals_ibp(
             doc.info_to_acct_owner_totals)
-        blocks.append(info_tot)
 
         # -XXX
-        epilog = self.write_epilog_ibp()
-        blocks.append(epilog)
+        yield self.write_epilog_ibp()
 
-        block = ''.join(blocks)
-        return block
+    def iter_document_ming(self, doc):
+        '''Yields the records of the document one at a time, so that only a
+        single record needs to be held in memory.'''
 
-    def write_document_ming(self, doc):
-        blocks = []
+        for record in self.iter_header_ming(doc):
+            yield record
+
+        for record in self.iter_entries_ming(doc.iter_entries()):
+            yield record
+
+        for record in self.iter_trailer_ming(doc):
+            yield record
+
+    def iter_header_ming(self, doc):
+        '''Yields the records that come before the entries.'''
 
         # {1:...}
-        export = self.write_export_info_ming()
-        blocks.append(export)
+        yield self.write_export_info_ming()
 
         # {2:...}
-        import_ = self.write_import_info_ming()
-        blocks.append(import_)
+        yield self.write_import_info_ming()
 
         # {4:
-        prolog = self.write_prolog_ming()
-        blocks.append(prolog)
+        yield self.write_prolog_ming()
 
         # :20:
-        trn = self.write_transaction_reference_number_ming(
+        yield self.write_transaction_reference_number_ming(
             doc.transaction_reference_number)
-        blocks.append(trn)
 
         # :25:
-        ai = self.write_account_identification(doc.account_identification)
-        blocks.append(ai)
+        yield self.write_account_identification(doc.account_identification)
 
         # :28C:
-        sn = self.write_statement_number(doc.statement_number)
-        blocks.append(sn)
+        yield self.write_statement_number(doc.statement_number)
 
         # :60F:
-        ob = self.write_opening_balance(doc.opening_balance)
-        blocks.append(ob)
+        yield self.write_opening_balance(doc.opening_balance)
+
+    def iter_entries_ming(self, entries):
+        '''Yields the records of `entries`, an iterable of (statement line,
+        infos) pairs like Mt940Document.iter_entries().'''
 
         # entries: :61: & :86:
-        for statement_line, infos in doc.entries.items():
-            sl = self.write_statement_line_ming(statement_line)
-            blocks.append(sl)
+        for statement_line, infos in entries:
+            yield self.write_statement_line_ming(statement_line)
             for info in infos:
-                inf = self.write_information_to_account_owner_ming(info)
-                blocks.append(inf)
+                yield self.write_information_to_account_owner_ming(info)
+
+    def iter_trailer_ming(self, doc):
+        '''Yields the records that come after the entries.'''
 
         # :62F:
-        cb = self.write_closing_balance(doc.closing_balance)
-        blocks.append(cb)
+        yield self.write_closing_balance(doc.closing_balance)
 
         # :64:
-        cab = self.write_closing_available_balance(doc.closing_available_balance)
-        blocks.append(cab)
+        yield self.write_closing_available_balance(doc.closing_available_balance)
 
         # :65:
         for forward_available_balance in doc.forward_available_balances:
-            fab = self.write_forward_available_balance(forward_available_balance)
-            blocks.append(fab)
+            yield self.write_forward_available_balance(forward_available_balance)
 
         # :86:
-        info_tot = self.write_information_to_account_owner_totals_ming(
+        yield self.write_information_to_account_owner_totals_ming(
             doc.info_to_acct_owner_totals)
-        blocks.append(info_tot)
 
         # -}
-        epilog = self.write_epilog_ming()
-        blocks.append(epilog)
+        yield self.write_epilog_ming()
 
-        block = ''.join(blocks)
+    def write_document_ibp(self, doc):
+        block = b''.join(self.iter_document_ibp(doc))
         return block
+
+    def write_document_ming(self, doc):
+        block = b''.join(self.iter_document_ming(doc))
+        return block
+
+    def write_document_ibp_into(self, doc, output=None):
+        '''Writes the document to the end of the bytearray `output` (a new
+        one if not given) and returns a memoryview of the bytes written. The
+        records are written straight into `output`, so they are never joined.
+        If writing fails nothing is added to `output`.
+
+        NOTE: A bytearray cannot be resized while a memoryview of it exists.'''
+
+        return self._write_document_into(self.iter_document_ibp, doc, output)
+
+    def write_document_ming_into(self, doc, output=None):
+        '''Like write_document_ibp_into, for the ming dialect.'''
+
+        return self._write_document_into(self.iter_document_ming, doc, output)
+
+    def _write_document_into(self, iter_document, doc, output):
+        if output is None:
+            output = bytearray()
+
+        start = len(output)
+
+        self.serializer.set_output(output)
+        try:
+            for _ in iter_document(doc):
+                pass
+        except Exception:
+            del output[start:]
+            raise
+        finally:
+            self.serializer.set_output(None)
+
+        return memoryview(output)[start:]
+
+    def write_document_ibp_to(self, doc, fp):
+        '''Writes the document to the file-like object `fp` in blocks of about
+        `output_block_size` bytes. Returns the number of bytes written.'''
+
+        return self._write_document_to(self.iter_document_ibp, doc, fp)
+
+    def write_document_ming_to(self, doc, fp):
+        '''Writes the document to the file-like object `fp` in blocks of about
+        `output_block_size` bytes. Returns the number of bytes written.'''
+
+        return self._write_document_to(self.iter_document_ming, doc, fp)
+
+    def _write_document_to(self, iter_document, doc, fp):
+        output = bytearray()
+        written = 0
+
+        # The sink is given a bytestring of every block rather than the
+        # bytearray itself, which is cleared and refilled for the next block.
+        # Sinks may keep what they are given (or, like GzipFile, only accept
+        # bytestrings).
+        self.serializer.set_output(output)
+        try:
+            for _ in iter_document(doc):
+                if len(output) >= self.output_block_size:
+                    fp.write(bytes(output))
+                    written += len(output)
+                    del output[:]
+
+        except Exception:
+            # Write out the records completed before the error, like when
+            # writing record by record
+            self.serializer.discard()
+            fp.write(bytes(output))
+            raise
+
+        finally:
+            self.serializer.set_output(None)
+
+        fp.write(bytes(output))
+        return written + len(output)
+
+    def iter_document_ibp_blocks(self, doc, block_size=None):
+        '''Yields the document in blocks of about `block_size` bytes
+        (`output_block_size` by default). A block is only written when it is
+        asked for, so the work per block is bounded. This suits event loops:
+        send a block, wait for the connection to drain, then ask for the next
+        one.'''
+
+        return self._iter_document_blocks(self.iter_document_ibp, doc, block_size)
+
+    def iter_document_ming_blocks(self, doc, block_size=None):
+        '''Like iter_document_ibp_blocks, for the ming dialect.'''
+
+        return self._iter_document_blocks(self.iter_document_ming, doc, block_size)
+
+    def _iter_document_blocks(self, iter_document, doc, block_size):
+        block_size = block_size or self.output_block_size
+        records = iter_document(doc)
+
+        done = False
+        while not done:
+            output = bytearray()
+            done = True
+
+            # The serializer only writes into `output` while a block is being
+            # written, so the writer can be used for other documents (on the
+            # same event loop) in between
+            serializer = self.serializer
+            serializer.set_output(output)
+            try:
+                for _ in records:
+                    if len(output) >= block_size:
+                        done = False
+                        break
+
+            finally:
+                serializer.set_output(None)
+
+            if output:
+                yield bytes(output)
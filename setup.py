@@ -43,6 +43,5 @@ setup(
     zip_safe=False,
     install_requires=[
         'Unidecode<0.5',  # translates unicode characters to ascii
-        'pycountry<2.0',  # provides currency codes
     ],
 )
@@ -0,0 +1,218 @@
+from unittest import TestCase
+
+from libmt94x.compiled import CompiledMt94xWriter
+from libmt94x.compiled import RecordPlan
+from libmt94x.info_acct_owner_subfields import BeneficiaryParty
+from libmt94x.info_acct_owner_subfields import BusinessPurpose
+from libmt94x.info_acct_owner_subfields import Charges
+from libmt94x.info_acct_owner_subfields import ClientReference
+from libmt94x.info_acct_owner_subfields import CounterPartyID
+from libmt94x.info_acct_owner_subfields import CounterPartyIdentification
+from libmt94x.info_acct_owner_subfields import CreditorID
+from libmt94x.info_acct_owner_subfields import EndToEndReference
+from libmt94x.info_acct_owner_subfields import ExchangeRate
+from libmt94x.info_acct_owner_subfields import InstructionID
+from libmt94x.info_acct_owner_subfields import MandateReference
+from libmt94x.info_acct_owner_subfields import OrderingParty
+from libmt94x.info_acct_owner_subfields import PaymentInformationID
+from libmt94x.info_acct_owner_subfields import PurposeCode
+from libmt94x.info_acct_owner_subfields import RemittanceInformation
+from libmt94x.info_acct_owner_subfields import ReturnReason
+from libmt94x.info_acct_owner_subfields import UltimateBeneficiary
+from libmt94x.info_acct_owner_subfields import UltimateCreditor
+from libmt94x.info_acct_owner_subfields import UltimateDebtor
+from libmt94x.remittance_info import DutchStructuredRemittanceInfo
+from libmt94x.remittance_info import IsoStructuredRemittanceInfo
+from libmt94x.remittance_info import UnstructuredRemittanceInfo
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.serializer import TrustedMt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+from tests import test_writer_doc_ibp_structured
+from tests import test_writer_doc_ibp_unstructured
+from tests import test_writer_doc_ming
+from tests import test_writer_fields
+
+
+# The tests of Mt94xWriter, run against CompiledMt94xWriter
+
+class CompiledWriterFieldsTests(test_writer_fields.Mt94xWriterTests):
+    def setUp(self):
+        self.serializer = Mt94xSerializer()
+        self.writer = CompiledMt94xWriter(self.serializer)
+
+
+class CompiledWriterIBPStructuredTests(test_writer_doc_ibp_structured.Mt94xWriterIBPStructuredTests):
+    def setUp(self):
+        self.serializer = Mt94xSerializer()
+        self.writer = CompiledMt94xWriter(self.serializer)
+
+
+class CompiledWriterIBPUnstructuredTests(test_writer_doc_ibp_unstructured.Mt94xWriterIBPUnstructuredTests):
+    def setUp(self):
+        self.serializer = Mt94xSerializer()
+        self.writer = CompiledMt94xWriter(self.serializer)
+
+
+class CompiledWriterMINGTests(test_writer_doc_ming.Mt94xWriterMINGTests):
+    def setUp(self):
+        self.serializer = Mt94xSerializer()
+        self.writer = CompiledMt94xWriter(self.serializer)
+
+    def test_doc_ming_spec_trusted_serializer(self):
+        doc = self.get_document()
+
+        writer = CompiledMt94xWriter(TrustedMt94xSerializer())
+        bytes = writer.write_document_ming(doc)
+
+        self.assertEquals(bytes, self.get_expected())
+
+
+class CompiledWriterCodeWordTests(TestCase):
+    '''Renders every kind of code word from its compiled plan and compares it
+    to what Mt94xWriter writes.'''
+
+    def setUp(self):
+        self.serializer = Mt94xSerializer()
+        self.writer = CompiledMt94xWriter(self.serializer)
+        self.reference_writer = Mt94xWriter(Mt94xSerializer())
+
+    def assertRendersLikeWriter(self, code_word):
+        serializer = self.reference_writer.serializer
+        serializer.start()
+        self.reference_writer._write_code_word(serializer, code_word)
+        expected = serializer.finish()
+
+        self.assertEquals(self.writer._render_code_word(code_word), expected)
+
+    def test_code_words(self):
+        code_words = [
+            BeneficiaryParty(
+                account_number='NL12COBA0733959555',
+                bic='COBANL2XXXX',
+                name='T-Mobile Netherlands BV',
+                city='AMSTERDAM',
+            ),
+            BusinessPurpose(id_code='Europese Incasso', sepa_transaction_type='eenmalig'),
+            Charges(charges='5'),
+            ClientReference(client_reference='IADS2342'),
+            CounterPartyID(
+                account_number='NL12COBA0733959555',
+                bic='COBANL2XXXX',
+                name='T-Mobile Netherlands BV',
+                city='AMSTERDAM',
+            ),
+            CounterPartyIdentification(id_code='ID01'),
+            CreditorID(creditor_id='NL32ZZZ999999991234'),
+            EndToEndReference(end_to_end_reference='EV12341REP1231456T1234'),
+            ExchangeRate(exchange_rate='1,1234'),
+            InstructionID(instruction_id='INSTR01'),
+            MandateReference(mandate_reference='MND-EV01'),
+            OrderingParty(
+                account_number='NL12COBA0733959555',
+                bic='COBANL2XXXX',
+                name='T-Mobile Netherlands BV',
+                city='AMSTERDAM',
+            ),
+            PaymentInformationID(payment_information_id='M000000003333333'),
+            PurposeCode(purpose_of_collection='OTHR'),
+            RemittanceInformation(UnstructuredRemittanceInfo('TOTAAL 1 VZ')),
+            RemittanceInformation(DutchStructuredRemittanceInfo('5200150700013379')),
+            RemittanceInformation(IsoStructuredRemittanceInfo('RF18539007547034')),
+            ReturnReason(reason_code='MS03'),
+            UltimateBeneficiary(name='Name'),
+            UltimateCreditor(name='Name/with/slashes', id='ID01'),
+            UltimateDebtor(name='Name', id='ID01'),
+        ]
+
+        for code_word in code_words:
+            self.assertRendersLikeWriter(code_word)
+
+    def test_code_words_optional_items(self):
+        # Items that are not given are written as empty values
+        code_words = [
+            BeneficiaryParty(),
+            BeneficiaryParty(account_number='NL12COBA0733959555', name='T-Mobile Netherlands BV'),
+            BusinessPurpose(),
+            BusinessPurpose(sepa_transaction_type='eenmalig'),
+            CounterPartyID(),
+            CounterPartyID(bic='COBANL2XXXX', city='AMSTERDAM'),
+            OrderingParty(),
+            OrderingParty(name='T-Mobile Netherlands BV'),
+            UltimateCreditor(),
+            UltimateCreditor(id='ID01'),
+            UltimateDebtor(),
+            UltimateDebtor(name='Name'),
+        ]
+
+        for code_word in code_words:
+            self.assertRendersLikeWriter(code_word)
+
+        self.assertEquals(self.writer._render_code_word(CounterPartyID()), b'/CNTP/////')
+
+    def test_code_words_empty_values(self):
+        code_words = [
+            Charges(charges=''),
+            ClientReference(client_reference=''),
+            EndToEndReference(end_to_end_reference=''),
+            UltimateBeneficiary(name=''),
+            RemittanceInformation(UnstructuredRemittanceInfo('')),
+        ]
+
+        for code_word in code_words:
+            self.assertRendersLikeWriter(code_word)
+
+    def test_code_word_slash_not_allowed(self):
+        eref = EndToEndReference(end_to_end_reference='A/B')
+
+        with self.assertRaises(ValueError):
+            self.writer._render_code_word(eref)
+
+    def test_code_word_too_long(self):
+        purp = PurposeCode(purpose_of_collection='OTHER')
+
+        with self.assertRaises(ValueError):
+            self.writer._render_code_word(purp)
+
+    def test_code_word_plan_reused(self):
+        self.writer._render_code_word(UltimateDebtor(name='Name'))
+        plan = self.writer._code_word_plans[UltimateDebtor]
+
+        self.assertEquals(self.writer._render_code_word(UltimateDebtor(id='ID01')), b'/ULTD//ID01/')
+        self.assertIs(self.writer._code_word_plans[UltimateDebtor], plan)
+
+
+class RecordPlanTests(TestCase):
+    def setUp(self):
+        self.serializer = Mt94xSerializer()
+
+    def test_render(self):
+        plan = RecordPlan(self.serializer, (
+            ('tag', 4, '20'),
+            ('chars', 3, 'ING'),
+            ('num', 5, lambda value: value),
+            ('newline',),
+        ))
+
+        # Constants are part of the template
+        self.assertEquals(plan.template, b':20:ING%s\r\n')
+        self.assertEquals(plan.render(b'123'), b':20:ING123\r\n')
+
+        with self.assertRaises(ValueError):
+            plan.render(b'12a')
+
+    def test_render_percent(self):
+        plan = RecordPlan(TrustedMt94xSerializer(), (
+            ('chars', 3, '10%'),
+            ('chars', 3, lambda value: value),
+        ))
+
+        self.assertEquals(plan.render(b'%s%'), b'10%%s%')
+
+    def test_constant_validated(self):
+        with self.assertRaises(ValueError):
+            RecordPlan(self.serializer, (('chars', 2, 'ING'),))
+
+    def test_unknown_step(self):
+        with self.assertRaises(ValueError):
+            RecordPlan(self.serializer, (('wrap', 65, b''),))
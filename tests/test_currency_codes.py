@@ -1,8 +1,14 @@
 from unittest import TestCase
+from unittest import skipIf
 
 from libmt94x.currency_codes import CurrencyCodes
 from libmt94x.currency_codes import InvalidCurrencyCodeError
 
+try:
+    import pycountry
+except ImportError:
+    pycountry = None
+
 
 class CurrencyCodesTests(TestCase):
     def setUp(self):
@@ -21,3 +27,26 @@ class CurrencyCodesTests(TestCase):
 
         rv = self.codes.code_is_valid('E!R')
         self.assertEquals(rv, False)
+
+    def test_code_none(self):
+        rv = self.codes.code_is_valid(None)
+        self.assertEquals(rv, False)
+
+    def test_codes_loaded_once(self):
+        codes = CurrencyCodes()
+        self.assertIs(codes.get_codes(), codes.get_codes())
+        self.assertEquals(codes.get_codes()['USD'], 'US Dollar')
+
+
+    # The bundled table was generated from pycountry, only check the codes
+    # that are the same in every release
+    @skipIf(pycountry is None, "pycountry is not installed")
+    def test_codes_in_pycountry(self):
+        stable_codes = ['CHF', 'EUR', 'GBP', 'JPY', 'NOK', 'SEK', 'USD']
+
+        pycountry_codes = set(getattr(currency, 'alpha_3', None) or currency.letter
+                              for currency in pycountry.currencies)
+
+        for code in stable_codes:
+            self.assertTrue(self.codes.code_is_valid(code))
+            self.assertTrue(code in pycountry_codes)
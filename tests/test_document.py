@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from unittest import TestCase
+
+from libmt94x.document import Mt940Document
+from libmt94x.fields import AccountIdentification
+from libmt94x.fields import ClosingAvailableBalance
+from libmt94x.fields import ClosingBalance
+from libmt94x.fields import InformationToAccountOwner
+from libmt94x.fields import InformationToAccountOwnerTotals
+from libmt94x.fields import OpeningBalance
+from libmt94x.fields import StatementLine
+from libmt94x.fields import StatementNumber
+from libmt94x.fields import TransactionReferenceNumber
+from libmt94x.info_acct_owner_subfields import EndToEndReference
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+
+class Mt940DocumentTests(TestCase):
+    def setUp(self):
+        self.serializer = Mt94xSerializer()
+        self.writer = Mt94xWriter(self.serializer)
+
+    def get_entries(self, num_entries):
+        for idx in range(num_entries):
+            line = StatementLine(
+                value_date=datetime(2014, 2, 20),
+                book_date=datetime(2014, 2, 20),
+                type=StatementLine.TYPE_CREDIT,
+                amount=Decimal('1.56'),
+                transaction_code='TRF',
+                reference_for_account_owner='EREF',
+                transaction_reference='%014d' % idx,
+                ing_transaction_code='00100',
+            )
+            info = InformationToAccountOwner(
+                code_words=[
+                    EndToEndReference('E2E%s' % idx),
+                ],
+            )
+            yield line, [info]
+
+    def get_document(self, entries):
+        return Mt940Document(
+            transaction_reference_number=TransactionReferenceNumber('P140220000000001'),
+            account_identification=AccountIdentification('NL69INGB0123456789', 'EUR'),
+            statement_number=StatementNumber('00000'),
+            opening_balance=OpeningBalance(
+                OpeningBalance.TYPE_CREDIT,
+                datetime(2014, 2, 19),
+                'EUR',
+                Decimal('662.23'),
+            ),
+            entries=entries,
+            closing_balance=ClosingBalance(
+                ClosingBalance.TYPE_CREDIT,
+                datetime(2014, 2, 20),
+                'EUR',
+                Decimal('666.91'),
+            ),
+            closing_available_balance=ClosingAvailableBalance(
+                ClosingAvailableBalance.TYPE_CREDIT,
+                datetime(2014, 2, 20),
+                'EUR',
+                Decimal('666.91'),
+            ),
+            info_to_acct_owner_totals=InformationToAccountOwnerTotals(
+                0,
+                3,
+                Decimal('0.00'),
+                Decimal('4.68'),
+            ),
+        )
+
+    def test_entries_generator(self):
+        doc_dict = self.get_document(OrderedDict(self.get_entries(3)))
+        doc_gen = self.get_document(self.get_entries(3))
+
+        # A generator of entries produces the same document
+        self.assertEquals(
+            self.writer.write_document_ming(doc_gen),
+            self.writer.write_document_ming(doc_dict),
+        )
+
+    def test_entries_list_of_pairs(self):
+        doc = self.get_document(list(self.get_entries(3)))
+
+        entries = list(doc.iter_entries())
+        self.assertEquals(len(entries), 3)
+
+    def test_entries_invalid_dict(self):
+        # A plain dict does not define the order of the entries
+        with self.assertRaises(ValueError):
+            self.get_document(dict(self.get_entries(3)))
+
+    def test_entries_invalid_values(self):
+        line, infos = next(self.get_entries(1))
+
+        with self.assertRaises(ValueError):
+            self.get_document(OrderedDict([(line, infos[0])]))
+
+    def test_entries_generator_validated_lazily(self):
+        line, infos = next(self.get_entries(1))
+
+        def entries():
+            yield line, infos
+            yield line, infos[0]  # not a list
+
+        # Construction succeeds since the entries have not been consumed yet
+        doc = self.get_document(entries())
+
+        it = doc.iter_entries()
+        self.assertEquals(next(it), (line, infos))
+        with self.assertRaises(ValueError):
+            next(it)
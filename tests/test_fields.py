@@ -0,0 +1,198 @@
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+from unittest import TestCase
+import pickle
+
+from libmt94x.fields import InformationToAccountOwner
+from libmt94x.fields import StatementLine
+from libmt94x.info_acct_owner_subfields import CounterPartyID
+from libmt94x.info_acct_owner_subfields import EndToEndReference
+from libmt94x.info_acct_owner_subfields import InfoToAcccountOwnerSubField
+from libmt94x.info_acct_owner_subfields import RemittanceInformation
+from libmt94x.info_acct_owner_subfields import ReturnReason
+from libmt94x.remittance_info import UnstructuredRemittanceInfo
+from libmt94x.statement_line_subfields import OriginalAmountOfTransaction
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+
+class UnorderedCodeWord(InfoToAcccountOwnerSubField):
+    tag = 'XXXX'
+    __slots__ = ()
+
+
+class FieldsTests(TestCase):
+    def get_entry(self):
+        line = StatementLine(
+            value_date=datetime(2014, 2, 20),
+            type=StatementLine.TYPE_CREDIT,
+            amount=Decimal('1.56'),
+            transaction_code='TRF',
+            reference_for_account_owner='EREF',
+            original_amount_of_transaction=OriginalAmountOfTransaction('EUR', Decimal('1.56')),
+        )
+        info = InformationToAccountOwner(
+            code_words=[
+                EndToEndReference('E2E1'),
+                RemittanceInformation(
+                    remittance_info=UnstructuredRemittanceInfo('Factuur 1'),
+                ),
+            ],
+        )
+        return line, info
+
+    # Amount tests
+
+    def test_amount_minor_units(self):
+        line = StatementLine(
+            value_date=datetime(2014, 2, 20),
+            type=StatementLine.TYPE_CREDIT,
+            amount=156,
+            transaction_code='TRF',
+            reference_for_account_owner='EREF',
+        )
+
+        writer = Mt94xWriter(Mt94xSerializer())
+        self.assertEquals(writer.write_statement_line_ibp(line),
+                          b':61:140220C1,56NTRFEREF\r\n')
+
+    def test_amount_float(self):
+        with self.assertRaises(ValueError):
+            StatementLine(
+                value_date=datetime(2014, 2, 20),
+                type=StatementLine.TYPE_CREDIT,
+                amount=1.56,
+                transaction_code='TRF',
+                reference_for_account_owner='EREF',
+            )
+
+    # Bulk constructor tests
+
+    def get_columns(self):
+        return dict(
+            value_dates=[datetime(2014, 2, 20), date(2014, 2, 21)],
+            types=[StatementLine.TYPE_CREDIT, StatementLine.TYPE_DEBIT],
+            amounts=[Decimal('1.56'), 250],
+            transaction_codes=['TRF', 'TRF'],
+            references_for_account_owner=['EREF', 'EREF'],
+            book_dates=[datetime(2014, 2, 20), None],
+            ing_transaction_codes=['00100', None],
+            transaction_references=['00000000000001', '00000000000002'],
+        )
+
+    def test_from_columns(self):
+        lines = StatementLine.from_columns(**self.get_columns())
+
+        expected = [
+            StatementLine(
+                value_date=datetime(2014, 2, 20),
+                type=StatementLine.TYPE_CREDIT,
+                amount=Decimal('1.56'),
+                transaction_code='TRF',
+                reference_for_account_owner='EREF',
+                book_date=datetime(2014, 2, 20),
+                ing_transaction_code='00100',
+                transaction_reference='00000000000001',
+            ),
+            StatementLine(
+                value_date=date(2014, 2, 21),
+                type=StatementLine.TYPE_DEBIT,
+                amount=250,
+                transaction_code='TRF',
+                reference_for_account_owner='EREF',
+                transaction_reference='00000000000002',
+            ),
+        ]
+
+        self.assertEquals(len(lines), 2)
+        for line, expected_line in zip(lines, expected):
+            self.assertEquals(line.__getstate__(), expected_line.__getstate__())
+
+    def test_from_columns_empty(self):
+        lines = StatementLine.from_columns([], [], [], [], [])
+        self.assertEquals(lines, [])
+
+    def test_from_columns_length_mismatch(self):
+        columns = self.get_columns()
+        columns['amounts'] = columns['amounts'][:1]
+
+        with self.assertRaises(ValueError):
+            StatementLine.from_columns(**columns)
+
+    def test_from_columns_invalid(self):
+        invalid = [
+            ('value_dates', [datetime(2014, 2, 20), '140221']),
+            ('book_dates', [datetime(2014, 2, 20), '140221']),
+            ('types', [StatementLine.TYPE_CREDIT, 3]),
+            ('amounts', [Decimal('1.56'), 2.5]),
+            ('transaction_codes', ['TRF', 'XXX']),
+            ('ing_transaction_codes', ['00100', '99999']),
+            ('original_amounts_of_transaction', [None, Decimal('1.56')]),
+        ]
+
+        for name, column in invalid:
+            columns = self.get_columns()
+            columns[name] = column
+
+            with self.assertRaises(ValueError):
+                StatementLine.from_columns(**columns)
+
+    # Date tests
+
+    def test_date(self):
+        line = StatementLine(
+            value_date=date(2014, 2, 20),
+            book_date=date(2014, 2, 21),
+            type=StatementLine.TYPE_CREDIT,
+            amount=Decimal('1.56'),
+            transaction_code='TRF',
+            reference_for_account_owner='EREF',
+            transaction_reference='00000000000001',
+            ing_transaction_code='00100',
+        )
+
+        writer = Mt94xWriter(Mt94xSerializer())
+        self.assertEquals(writer.write_statement_line_ming(line),
+                          b':61:1402200221C1,56NTRFEREF//00000000000001\r\n/TRCD/00100/\r\n')
+
+    # Memory layout tests
+
+    def test_no_instance_dict(self):
+        line, info = self.get_entry()
+
+        for obj in (line, info, info.code_words[0], info.code_words[1],
+                    info.code_words[1].remittance_info,
+                    line.original_amount_of_transaction):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_pickle(self):
+        line, info = self.get_entry()
+        writer = Mt94xWriter(Mt94xSerializer())
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            line_copy, info_copy = pickle.loads(pickle.dumps((line, info), protocol))
+
+            self.assertEquals(writer.write_statement_line_ibp(line_copy),
+                              writer.write_statement_line_ibp(line))
+            self.assertEquals(writer.write_information_to_account_owner_ming(info_copy),
+                              writer.write_information_to_account_owner_ming(info))
+
+    # Code word lookup tests
+
+    def test_get_code_word_by_cls(self):
+        first, second = EndToEndReference('E2E1'), EndToEndReference('E2E2')
+        info = InformationToAccountOwner(code_words=[first, second])
+
+        self.assertIs(info.get_code_word_by_cls(EndToEndReference), second)
+        self.assertIs(info.get_code_word_by_cls(ReturnReason), None)
+        self.assertEquals(info.by_class, {EndToEndReference: second})
+
+    def test_get_ordered_code_words(self):
+        eref = EndToEndReference('E2E1')
+        cntp = CounterPartyID(name='ING')
+        rtrn = ReturnReason('MD06')
+        info = InformationToAccountOwner(
+            code_words=[cntp, UnorderedCodeWord(), eref, rtrn])
+
+        self.assertEquals(info.get_ordered_code_words(), [rtrn, eref, cntp])
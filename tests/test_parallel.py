@@ -0,0 +1,149 @@
+from io import BytesIO
+from unittest import TestCase
+import os
+
+from libmt94x.parallel import _validate_messages
+from libmt94x.parallel import Mt94xParallelParser
+from libmt94x.parallel import Mt94xParallelWriter
+from libmt94x.parser import Mt94xParser
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+
+def read_example(filename):
+    fp = os.path.join(os.path.dirname(__file__), 'examples', filename)
+    with open(fp, 'rb') as f:
+        return f.read()
+
+
+class Mt94xParallelParserTests(TestCase):
+    def setUp(self):
+        self.parser = Mt94xParser()
+        self.parallel_parser = Mt94xParallelParser(workers=2, chunksize=3)
+        self.writer = Mt94xWriter(Mt94xSerializer())
+
+        # Ten messages, so that some chunks are incomplete
+        self.message = read_example('ming-from-spec.txt')
+        self.source = self.message * 10
+
+    def test_iter_documents_ming(self):
+        docs = list(self.parallel_parser.iter_documents_ming(self.source))
+
+        self.assertEquals(len(docs), 10)
+        for doc in docs:
+            self.assertEquals(self.writer.write_document_ming(doc), self.message)
+
+    def test_iter_documents_ibp(self):
+        message = read_example('ibp-unstructured-ing-provided-example.txt')
+
+        docs = list(self.parallel_parser.iter_documents_ibp(message + b'\r\n' + message))
+
+        self.assertEquals(len(docs), 2)
+        self.assertEquals(docs[1].statement_number.statement_number, b'1')
+
+    def test_iter_documents_ordered(self):
+        # Give every message its own statement number
+        source = b''.join(
+            self.message.replace(b':28C:00000', b':28C:%05d' % idx)
+            for idx in range(10)
+        )
+
+        docs = self.parallel_parser.iter_documents_ming(source)
+
+        numbers = [doc.statement_number.statement_number for doc in docs]
+        self.assertEquals(numbers, [b'%05d' % idx for idx in range(10)])
+
+    def test_validate_documents_ming(self):
+        broken = self.message.replace(b':60F:C', b':60F:X')
+        source = self.message * 4 + broken + self.message
+
+        errors = self.parallel_parser.validate_documents_ming(source)
+
+        self.assertEquals(len(errors), 1)
+        self.assertEquals(errors[0][0], 4)
+        self.assertTrue(':60F:' in errors[0][1])
+
+    def test_validate_messages_any_error(self):
+        # Not a bytestring, which the parser does not raise a ValueError for
+        errors = _validate_messages('ming', False, [self.message, None])
+
+        self.assertEquals(errors[0], None)
+        self.assertTrue(errors[1])
+
+    def test_validate_documents_ming_ok(self):
+        errors = self.parallel_parser.validate_documents_ming(self.source)
+        self.assertEquals(errors, [])
+
+
+class Mt94xParallelWriterTests(TestCase):
+    def setUp(self):
+        self.parser = Mt94xParser()
+        self.writer = Mt94xWriter(Mt94xSerializer())
+
+        # Give every document its own statement number
+        example = read_example('ming-from-spec.txt')
+        self.messages = [example.replace(b':28C:00000', b':28C:%05d' % idx)
+                         for idx in range(10)]
+        self.docs = [self.parser.parse_document_ming(message)
+                     for message in self.messages]
+
+    def test_iter_documents_ming(self):
+        for backend in ('process', 'thread'):
+            parallel_writer = Mt94xParallelWriter(workers=2, chunksize=3, backend=backend)
+
+            # Input order is preserved
+            messages = list(parallel_writer.iter_documents_ming(iter(self.docs)))
+            self.assertEquals(messages, self.messages)
+
+    def test_iter_documents_ibp(self):
+        message = read_example('ibp-unstructured-ing-provided-example.txt')
+        doc = self.parser.parse_document_ibp(message)
+
+        parallel_writer = Mt94xParallelWriter(workers=2, chunksize=1, trusted=True)
+        messages = list(parallel_writer.iter_documents_ibp([doc, doc, doc]))
+
+        self.assertEquals(messages, [self.writer.write_document_ibp(doc)] * 3)
+
+    def test_write_documents_ming_to(self):
+        parallel_writer = Mt94xParallelWriter(workers=2, chunksize=3, backend='thread')
+
+        fp = BytesIO()
+        parallel_writer.write_documents_ming_to(self.docs, fp)
+
+        self.assertEquals(fp.getvalue(), b''.join(self.messages))
+
+    def test_write_error(self):
+        self.docs[4].transaction_reference_number = None
+        parallel_writer = Mt94xParallelWriter(workers=2, chunksize=3)
+
+        with self.assertRaises(AttributeError):
+            list(parallel_writer.iter_documents_ming(self.docs))
+
+    def test_backend_invalid(self):
+        with self.assertRaises(ValueError):
+            Mt94xParallelWriter(backend='fork')
+
+    def test_write_document_ibp(self):
+        message = read_example('ibp-unstructured-ing-provided-example.txt')
+        doc = self.parser.parse_document_ibp(message)
+
+        for backend in ('process', 'thread'):
+            parallel_writer = Mt94xParallelWriter(workers=2, backend=backend, entries_chunksize=2)
+
+            self.assertEquals(parallel_writer.write_document_ibp(doc),
+                              self.writer.write_document_ibp(doc))
+
+    def test_write_document_ming_to(self):
+        doc = self.docs[0]
+        parallel_writer = Mt94xParallelWriter(workers=2, entries_chunksize=1)
+
+        # The entries come back in blocks of a single entry
+        num_records = len(list(self.writer.iter_document_ming(doc)))
+        num_infos = sum(len(infos) for _, infos in doc.iter_entries())
+        self.assertEquals(len(list(parallel_writer.iter_document_ming(doc))),
+                          num_records - num_infos)
+
+        fp = BytesIO()
+        parallel_writer.write_document_ming_to(doc, fp)
+
+        self.assertEquals(fp.getvalue(), self.messages[0])
@@ -0,0 +1,332 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest import TestCase
+import os
+
+from libmt94x.fields import InformationToAccountOwner
+from libmt94x.fields import StatementLine
+from libmt94x.info_acct_owner_subfields import CounterPartyID
+from libmt94x.info_acct_owner_subfields import EndToEndReference
+from libmt94x.info_acct_owner_subfields import MandateReference
+from libmt94x.info_acct_owner_subfields import RemittanceInformation
+from libmt94x.info_acct_owner_subfields import ReturnReason
+from libmt94x.info_acct_owner_subfields import UltimateCreditor
+from libmt94x.parser import Mt94xParser
+from libmt94x.parser import Mt94xSplitter
+from libmt94x.parser import Mt94xTokenizer
+from libmt94x.remittance_info import DutchStructuredRemittanceInfo
+from libmt94x.remittance_info import UnstructuredRemittanceInfo
+from libmt94x.serializer import Mt94xSerializer
+from libmt94x.writer import Mt94xWriter
+
+
+def get_example_path(filename):
+    return os.path.join(os.path.dirname(__file__), 'examples', filename)
+
+def read_example(filename):
+    with open(get_example_path(filename), 'rb') as f:
+        return f.read()
+
+
+class Mt94xTokenizerTests(TestCase):
+    def setUp(self):
+        self.tokenizer = Mt94xTokenizer()
+
+    def test_tokenize(self):
+        lines = [
+            b'{1:F01INGBNL2ABXXX0000000000}{4:\r\n',
+            b':20:P140104000009999\r\n',
+            b':86:/EREF/E2E2014030100899040//CNTP/NL08INGB0000001234/INGBNL2A/ING T\r\n',
+            b'estrekening/AMSTERDAM/\r\n',
+            b'-}{1:F01INGBNL2ABXXX0000000000}{4:\r\n',
+            b':20:P140104000009999\r\n',
+            b'-}',
+        ]
+
+        tokens = list(self.tokenizer.tokenize(lines))
+        self.assertEquals(tokens, [
+            (Mt94xTokenizer.TOKEN_HEADER, None, [b'{1:F01INGBNL2ABXXX0000000000}{4:']),
+            (Mt94xTokenizer.TOKEN_FIELD, '20', [b'P140104000009999']),
+            (Mt94xTokenizer.TOKEN_FIELD, '86', [
+                b'/EREF/E2E2014030100899040//CNTP/NL08INGB0000001234/INGBNL2A/ING T',
+                b'estrekening/AMSTERDAM/',
+            ]),
+            (Mt94xTokenizer.TOKEN_EPILOG, None, [b'-}']),
+            (Mt94xTokenizer.TOKEN_HEADER, None, [b'{1:F01INGBNL2ABXXX0000000000}{4:']),
+            (Mt94xTokenizer.TOKEN_FIELD, '20', [b'P140104000009999']),
+            (Mt94xTokenizer.TOKEN_EPILOG, None, [b'-}']),
+        ])
+
+
+class Mt94xSplitterTests(TestCase):
+    def setUp(self):
+        self.splitter = Mt94xSplitter()
+
+    def test_split_multiple_messages(self):
+        source = read_example('ming-ing-provided-example-multiple-messages.txt')
+
+        messages = list(self.splitter.split(source))
+        self.assertEquals(len(messages), 2)
+
+        # Messages are split on the terminator, which may be followed by the
+        # next message on the same line
+        self.assertTrue(messages[0].endswith(b':86:/NAME/ING BANK N.V.//BIC/INGBNL2A//SUM/1/0/15,00/0,/\r\n-}'))
+        self.assertTrue(messages[1].startswith(b'{1:F01INGBNL2ABXXX0000000000}'))
+        self.assertTrue(messages[1].endswith(b'-}\r\n'))
+        self.assertEquals(b''.join(messages), source)
+
+    def test_split_single_message(self):
+        source = read_example('ibp-structured-ing-provided-example-edited.txt')
+
+        messages = list(self.splitter.split(source))
+        self.assertEquals(messages, [source])
+
+    def test_split_wrapped_epilog(self):
+        # Free text that wraps onto a line starting like an epilog does not
+        # end the message
+        message = (
+            b':20:P140220000000001\r\n'
+            b':86:' + b'A' * 65 + b'\r\n'
+            b'-XXX TEST INVOICE 1234\r\n'
+            b'-XXX'
+        )
+        source = message + b'\r\n' + message
+
+        messages = list(self.splitter.split(source))
+        self.assertEquals(messages, [message + b'\r\n', message])
+
+    def test_split_unterminated_message(self):
+        source = read_example('ming-from-spec.txt')[:-len(b'-}')]
+
+        messages = list(self.splitter.split(source))
+        self.assertEquals(messages, [source])
+
+
+class Mt94xParserTests(TestCase):
+    def setUp(self):
+        self.parser = Mt94xParser()
+        self.writer = Mt94xWriter(Mt94xSerializer())
+
+    # Round trip tests
+
+    def test_round_trip_ibp_structured(self):
+        expected = read_example('ibp-structured-ing-provided-example-edited.txt')
+
+        doc = self.parser.parse_document_ibp(expected)
+        self.assertEquals(self.writer.write_document_ibp(doc), expected)
+
+    def test_document_ibp_structured_without_qualifier(self):
+        # The original example leaves out the remittance info qualifier, which
+        # is written back as USTD
+        source = read_example('ibp-structured-ing-provided-example.txt')
+        expected = read_example('ibp-structured-ing-provided-example-edited.txt')
+
+        doc = self.parser.parse_document_ibp(source)
+        self.assertEquals(self.writer.write_document_ibp(doc), expected)
+
+    def test_round_trip_ibp_unstructured(self):
+        expected = read_example('ibp-unstructured-ing-provided-example.txt')
+
+        doc = self.parser.parse_document_ibp(expected)
+        self.assertEquals(self.writer.write_document_ibp(doc), expected)
+
+    def test_round_trip_ibp_servicing_institutions_reference(self):
+        doc = self.parser.parse_document_ibp(read_example('ibp-unstructured-ing-provided-example.txt'))
+
+        statement_line = list(doc.entries)[0]
+        statement_line.reference_for_account_owner = b'EREF'
+        statement_line.account_servicing_institutions_reference = b'ASIREF'
+
+        expected = self.writer.write_document_ibp(doc)
+        self.assertTrue(b'NNOVEREFASIREF\r\n' in expected)
+
+        doc = self.parser.parse_document_ibp(expected)
+        self.assertEquals(self.writer.write_document_ibp(doc), expected)
+
+        # The references cannot be told apart, see parse_statement_line_ibp
+        statement_line = list(doc.entries)[0]
+        self.assertEquals(statement_line.reference_for_account_owner, b'EREFASIREF')
+        self.assertEquals(statement_line.account_servicing_institutions_reference, None)
+
+    def test_statement_line_ibp_long_references(self):
+        sl = self.parser.parse_statement_line_ibp([b'140220C1,56NTRFEREF00000000000XINGA00000XXXX'])
+
+        self.assertEquals(sl.reference_for_account_owner, b'EREF00000000000X')
+        self.assertEquals(sl.account_servicing_institutions_reference, b'INGA00000XXXX')
+
+        bytes = self.writer.write_statement_line_ibp(sl)
+        self.assertEquals(bytes, b':61:140220C1,56NTRFEREF00000000000XINGA00000XXXX\r\n')
+
+    def test_round_trip_ming(self):
+        expected = read_example('ming-from-spec.txt')
+
+        doc = self.parser.parse_document_ming(expected)
+        self.assertEquals(self.writer.write_document_ming(doc), expected)
+
+    def test_round_trip_ming_minor_units(self):
+        expected = read_example('ming-from-spec.txt')
+
+        parser = Mt94xParser(minor_units=True)
+        doc = parser.parse_document_ming(expected)
+        self.assertEquals(type(doc.opening_balance.amount), int)
+        self.assertEquals(self.writer.write_document_ming(doc), expected)
+
+    def test_round_trip_ibp_wrapped_epilog(self):
+        doc = self.parser.parse_document_ibp(read_example('ibp-unstructured-ing-provided-example.txt'))
+
+        # The free text wraps onto a line that starts like the epilog
+        statement_line = list(doc.entries)[0]
+        doc.entries[statement_line] = [
+            InformationToAccountOwner(free_form_text=b'A' * 65 + b'-XXX TEST INVOICE 1234')]
+
+        expected = self.writer.write_document_ibp(doc)
+        self.assertTrue(b'\r\n-XXX TEST INVOICE 1234\r\n' in expected)
+
+        doc = self.parser.parse_document_ibp(expected)
+        self.assertEquals(self.writer.write_document_ibp(doc), expected)
+
+    def test_round_trip_ming_wrapped_epilog(self):
+        doc = self.parser.parse_document_ming(read_example('ming-from-spec.txt'))
+
+        statement_line = list(doc.entries)[0]
+        doc.entries[statement_line] = [InformationToAccountOwner(code_words=[
+            RemittanceInformation(UnstructuredRemittanceInfo(b'A' * 49 + b'-} TEST INVOICE 1234'))])]
+
+        expected = self.writer.write_document_ming(doc)
+        self.assertTrue(b'\r\n-} TEST INVOICE 1234/\r\n' in expected)
+
+        doc = self.parser.parse_document_ming(expected)
+        self.assertEquals(self.writer.write_document_ming(doc), expected)
+
+    # Document tests
+
+    def test_document_ming_single_message(self):
+        doc = self.parser.parse_document_ming(
+            read_example('ming-ing-provided-example-single-message.txt'))
+
+        self.assertEquals(doc.transaction_reference_number.transaction_reference_number,
+                          b'P140104000009999')
+        self.assertEquals(doc.account_identification.iban, b'NL20INGB0001234567')
+        self.assertEquals(doc.account_identification.iso_currency_code, b'EUR')
+        self.assertEquals(doc.statement_number.statement_number, b'3')
+        self.assertEquals(doc.opening_balance.amount, Decimal('1000.00'))
+        self.assertEquals(doc.closing_balance.amount, Decimal('4882.15'))
+        self.assertEquals(doc.forward_available_balances, [])
+
+        totals = doc.info_to_acct_owner_totals
+        self.assertEquals(totals.num_debit, 4)
+        self.assertEquals(totals.num_credit, 5)
+        self.assertEquals(totals.amount_debit, Decimal('627.00'))
+        self.assertEquals(totals.amount_credit, Decimal('3969.15'))
+
+        entries = list(doc.iter_entries())
+        self.assertEquals(len(entries), 9)
+
+        # :61:1401030103D300,00NRTIEREF//00000000000004
+        # /TRCD/01304/
+        line, infos = entries[3]
+        self.assertEquals(line.value_date, datetime(2014, 1, 3))
+        self.assertEquals(line.book_date, datetime(2014, 1, 3))
+        self.assertEquals(line.type, StatementLine.TYPE_DEBIT)
+        self.assertEquals(line.amount, Decimal('300.00'))
+        self.assertEquals(line.transaction_code, b'RTI')
+        self.assertEquals(line.reference_for_account_owner, b'EREF')
+        self.assertEquals(line.transaction_reference, b'00000000000004')
+        self.assertEquals(line.ing_transaction_code, b'01304')
+
+        # The field spans lines that are broken at arbitrary positions
+        self.assertEquals(len(infos), 1)
+        code_words = infos[0].code_words
+        self.assertEquals(len(code_words), 6)
+        self.assertEquals(code_words[0].__class__, ReturnReason)
+        self.assertEquals(code_words[0].reason_code, b'MD06')
+        self.assertEquals(code_words[2].__class__, MandateReference)
+        self.assertEquals(code_words[2].mandate_reference, b'MNDTID5653M5')
+        self.assertEquals(code_words[4].__class__, CounterPartyID)
+        self.assertEquals(code_words[4].account_number, b'NL08INGB0000001234')
+        self.assertEquals(code_words[4].bic, b'INGBNL2A')
+        self.assertEquals(code_words[4].name, b'ING Testrekening')
+        self.assertEquals(code_words[4].city, b'AMSTERDAM')
+        self.assertEquals(code_words[5].__class__, RemittanceInformation)
+        self.assertEquals(code_words[5].remittance_info.__class__, UnstructuredRemittanceInfo)
+        self.assertEquals(code_words[5].remittance_info.remittance_info,
+                          b'UstrdRemInf87899100')
+
+    def test_documents_ming_multiple_messages(self):
+        with open(get_example_path('ming-ing-provided-example-multiple-messages.txt'), 'rb') as f:
+            docs = list(self.parser.iter_documents_ming(f))
+
+        self.assertEquals(len(docs), 2)
+        self.assertEquals(docs[0].statement_number.statement_number, b'3')
+        self.assertEquals(docs[1].statement_number.statement_number, b'4')
+
+        # The totals of the second message contain a stray space
+        self.assertEquals(docs[1].info_to_acct_owner_totals.num_debit, 1)
+
+        line, infos = list(docs[1].iter_entries())[0]
+        remi = infos[0].code_words[-1]
+        self.assertEquals(remi.remittance_info.__class__, DutchStructuredRemittanceInfo)
+        self.assertEquals(remi.remittance_info.payment_reference, b'5200150700013379')
+
+    def test_document_ming_expects_single_message(self):
+        with self.assertRaises(ValueError):
+            self.parser.parse_document_ming(
+                read_example('ming-ing-provided-example-multiple-messages.txt'))
+
+    def test_document_not_terminated(self):
+        source = read_example('ming-from-spec.txt')
+
+        with self.assertRaises(ValueError):
+            self.parser.parse_document_ming(source[:-len(b'-}')])
+
+    def test_document_unexpected_field(self):
+        source = read_example('ming-from-spec.txt').replace(b':28C:', b':28D:')
+
+        with self.assertRaises(ValueError):
+            self.parser.parse_document_ming(source)
+
+    # Field tests
+
+    def test_statement_line_ming_book_date_previous_year(self):
+        line = self.parser.parse_statement_line_ming([
+            b'1401021231D15,00NTRFEREF//00000000000001',
+            b'/TRCD/00108/',
+        ])
+        self.assertEquals(line.value_date, datetime(2014, 1, 2))
+        self.assertEquals(line.book_date, datetime(2013, 12, 31))
+
+    def test_amount_minor_units(self):
+        parser = Mt94xParser(minor_units=True)
+
+        self.assertEquals(parser.parse_amount(b'564,35'), 56435)
+        self.assertEquals(parser.parse_amount(b'564,3'), 56430)
+        self.assertEquals(parser.parse_amount(b'564,'), 56400)
+        self.assertEquals(parser.parse_amount(b'564,355'), 56436)
+
+    def test_statement_line_malformed(self):
+        with self.assertRaises(ValueError):
+            self.parser.parse_statement_line_ming([b'140102X15,00NTRFEREF//1'])
+
+    def test_code_word_with_slash(self):
+        info = self.parser.parse_information_to_account_owner_ming(
+            b'/EREF/E2E1//ULTC/Name/with/slashes/ID01/')
+
+        code_words = info.code_words
+        self.assertEquals(code_words[0].__class__, EndToEndReference)
+        self.assertEquals(code_words[1].__class__, UltimateCreditor)
+        self.assertEquals(code_words[1].name, b'Name/with/slashes')
+        self.assertEquals(code_words[1].id, b'ID01')
+
+    def test_code_word_remittance_info_unknown_qualifier(self):
+        info = self.parser.parse_information_to_account_owner_ming(b'/REMI/XXXX//Invoice 1234/')
+
+        remi = info.code_words[0]
+        self.assertEquals(remi.remittance_info.__class__, UnstructuredRemittanceInfo)
+        self.assertEquals(remi.remittance_info.remittance_info, b'XXXX//Invoice 1234')
+
+    def test_information_to_account_owner_ibp_unstructured(self):
+        info = self.parser.parse_information_to_account_owner_ibp(
+            b'AC04 NL20INGB0002222222 INGBNL2A')
+
+        self.assertEquals(info.code_words, [])
+        self.assertEquals(info.free_form_text, b'AC04 NL20INGB0002222222 INGBNL2A')
@@ -1,8 +1,10 @@
+from datetime import date
 from datetime import datetime
 from decimal import Decimal
 from unittest import TestCase
 
 from libmt94x.serializer import Mt94xSerializer
+from libmt94x.serializer import TrustedMt94xSerializer
 
 
 class Mt94xSerializerTests(TestCase):
@@ -36,6 +38,11 @@ class Mt94xSerializerTests(TestCase):
         with self.assertRaises(ValueError):
             self.ser.serialize_value(self.ser.type_char, 3, b'\x00\x01')
 
+    def test_char_charset_outside_range_high_bytes(self):
+        # Try with some bytes outside of ascii
+        with self.assertRaises(ValueError):
+            self.ser.serialize_value(self.ser.type_char, 3, b'a\xe9b')
+
     def test_char_charset_too_long(self):
         # Exceeds field length
         with self.assertRaises(ValueError):
@@ -93,6 +100,28 @@ class Mt94xSerializerTests(TestCase):
         with self.assertRaises(ValueError):
             self.ser.serialize_amount(15, 'EUR', Decimal('-101.45'))
 
+    def test_amount_minor_units(self):
+        val = self.ser.serialize_amount(15, 'EUR', 10145)
+        self.assertEquals(val, b'101,45')
+
+        val = self.ser.serialize_amount(15, 'EUR', 5)
+        self.assertEquals(val, b'0,05')
+
+        val = self.ser.serialize_amount(15, 'EUR', long(10145))
+        self.assertEquals(val, b'101,45')
+
+    def test_amount_minor_units_too_long(self):
+        with self.assertRaises(ValueError):
+            self.ser.serialize_amount(4, 'EUR', 10145)
+
+    def test_amount_minor_units_negative(self):
+        with self.assertRaises(ValueError):
+            self.ser.serialize_amount(15, 'EUR', -10145)
+
+    def test_amount_bool(self):
+        with self.assertRaises(ValueError):
+            self.ser.serialize_amount(15, 'EUR', True)
+
     # Date tests
 
     def test_date_ok(self):
@@ -103,6 +132,34 @@ class Mt94xSerializerTests(TestCase):
         with self.assertRaises(ValueError):
             self.ser.serialize_date('%y%m%d', '140203')
 
+    def test_date_date(self):
+        val = self.ser.serialize_date('%y%m%d', date(2014, 2, 3))
+        self.assertEquals(val, b'140203')
+
+    def test_day_ok(self):
+        val = self.ser.serialize_day('%y%m%d', datetime(2014, 2, 3, 12, 30))
+        self.assertEquals(val, b'140203')
+
+        # Cached by day, independent of the time and type
+        val = self.ser.serialize_day('%y%m%d', date(2014, 2, 3))
+        self.assertEquals(val, b'140203')
+
+        val = self.ser.serialize_day('%m%d', date(2014, 2, 3))
+        self.assertEquals(val, b'0203')
+
+    def test_day_wrong_type(self):
+        with self.assertRaises(ValueError):
+            self.ser.serialize_day('%y%m%d', '140203')
+
+    def test_day_cache_bounded(self):
+        self.ser.date_cache_size = 10
+
+        for day in range(1, 29):
+            val = self.ser.serialize_day('%y%m%d', date(2014, 2, day))
+            self.assertEquals(val, b'1402%02d' % day)
+
+        self.assertTrue(len(self.ser._date_cache) <= 10)
+
     # Chaining tests
 
     def test_chain_api(self):
@@ -122,3 +179,113 @@ class Mt94xSerializerTests(TestCase):
         self.ser.start()
         with self.assertRaises(ValueError):
             self.ser.chars_noslash(45, 'A/B testing is cool')
+
+    def test_tag(self):
+        val = self.ser.start().tag(5, '28C').tag(5, '28C').finish()
+        self.assertEquals(val, b':28C::28C:')
+
+        with self.assertRaises(ValueError):
+            self.ser.start().tag(4, '28C')
+
+    def test_raw(self):
+        val = self.ser.start().chars(2, '-}').raw(b'\r\n').finish()
+        self.assertEquals(val, b'-}\r\n')
+
+    # Wrapping tests
+
+    def test_wrap(self):
+        self.ser.start().chars(4, ':86:').wrap(5).chars(12, 'abcdefghijkl').newline()
+        self.assertEquals(self.ser.wrapped_length, 14)
+
+        val = self.ser.finish()
+        self.assertEquals(val, b':86:abcde\r\nfghij\r\nkl\r\n')
+
+    def test_wrap_full_line(self):
+        # No empty line is produced for a line that fills the width
+        val = self.ser.start().wrap(5).chars(10, 'abcdefghij').newline().finish()
+        self.assertEquals(val, b'abcde\r\nfghij\r\n')
+
+    def test_wrap_one_short_of_full_line(self):
+        val = self.ser.start().wrap(5).chars(9, 'abcdefghi').newline().finish()
+        self.assertEquals(val, b'abcde\r\nfghi\r\n')
+
+    def test_finish_ends_wrap(self):
+        self.ser.start().wrap(5).chars(9, 'abcdefghi').finish()
+
+        val = self.ser.start().chars(9, 'abcdefghi').finish()
+        self.assertEquals(val, b'abcdefghi')
+
+    # Output tests
+
+    def test_output(self):
+        output = bytearray(b'>')
+        self.ser.set_output(output)
+
+        self.assertEquals(self.ser.start().chars(4, ':20:').newline().finish(), None)
+        self.ser.start().chars(4, ':86:').wrap(5).chars(12, 'abcdefghijkl').newline()
+        self.assertEquals(self.ser.wrapped_length, 14)
+        self.assertEquals(self.ser.length, 18)
+        self.ser.finish()
+
+        self.assertEquals(output, b'>:20:\r\n:86:abcde\r\nfghij\r\nkl\r\n')
+
+        # Back to returning records
+        self.ser.set_output(None)
+        self.assertEquals(self.ser.start().chars(4, ':20:').finish(), b':20:')
+        self.assertEquals(output, b'>:20:\r\n:86:abcde\r\nfghij\r\nkl\r\n')
+
+    def test_emit(self):
+        self.assertEquals(self.ser.emit(b':20:\r\n'), b':20:\r\n')
+
+        output = bytearray()
+        self.ser.set_output(output)
+
+        self.assertEquals(self.ser.emit(b':20:\r\n'), None)
+        self.ser.start().chars(4, ':86:').discard()
+
+        self.assertEquals(output, b':20:\r\n')
+
+    def test_output_discard(self):
+        output = bytearray()
+        self.ser.set_output(output)
+
+        self.ser.start().chars(4, ':20:').finish()
+        self.ser.start().chars(4, ':86:').discard()
+
+        self.assertEquals(output, b':20:')
+
+
+class TrustedMt94xSerializerTests(TestCase):
+    def setUp(self):
+        self.ser = TrustedMt94xSerializer()
+
+    def test_chain_api(self):
+        val = (self.ser
+               .start()
+               .chars(4, ':61:')
+               .date_yymmdd(datetime(2014, 2, 21))
+               .chars(1, 'C')
+               .amount(15, 'EUR', Decimal('564.35'))
+               .num(6, '123', leading_zero=True)
+               .chars_noslash(4, 'EREF')
+               .newline()
+               .finish()
+        )
+        self.assertEquals(val, b':61:140221C564,35000123EREF\r\n')
+
+    def test_amount_minor_units(self):
+        val = self.ser.serialize_amount(15, 'EUR', 56435)
+        self.assertEquals(val, b'564,35')
+
+    def test_value_not_validated(self):
+        # Exceeds field length and contains bytes outside the charset
+        val = self.ser.serialize_value(self.ser.type_char, 3, b'a#b@c')
+        self.assertEquals(val, b'a#b@c')
+
+    def test_chars_noslash_not_validated(self):
+        val = (self.ser
+               .start()
+               .chars_noslash(45, 'A/B testing is cool')
+               .finish()
+        )
+        self.assertEquals(val, b'A/B testing is cool')
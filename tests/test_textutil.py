@@ -3,6 +3,8 @@ from unittest import TestCase
 
 from libmt94x.textutil import break_at_width
 from libmt94x.textutil import format_amount
+from libmt94x.textutil import format_amounts
+from libmt94x.textutil import to_minor_units
 
 
 class TextUtilTests(TestCase):
@@ -39,6 +41,46 @@ class TextUtilTests(TestCase):
         rv = format_amount(Decimal('1.23'), locale='nl_NL')
         self.assertEquals('1,23', rv)
 
+    def test_format_amount_nl_quantized(self):
+        self.assertEquals(format_amount(Decimal('12'), locale='nl_NL'), '12,00')
+        self.assertEquals(format_amount(Decimal('1.2'), locale='nl_NL'), '1,20')
+        self.assertEquals(format_amount(Decimal('1E+2'), locale='nl_NL'), '100,00')
+        self.assertEquals(format_amount(Decimal('0.001'), locale='nl_NL'), '0,00')
+
+    def test_format_amount_nl_exact(self):
+        # As a float 1.015 is 1.01499999999999990230037...
+        rv = format_amount(Decimal('1.015'), locale='nl_NL')
+        self.assertEquals('1,02', rv)
+
+    def test_format_amount_nl_not_decimal(self):
+        rv = format_amount(1.5, locale='nl_NL')
+        self.assertEquals('1,50', rv)
+
     def test_format_amount_fr(self):
         with self.assertRaises(NotImplementedError):
             format_amount(Decimal('1.23'), locale='fr_FR')
+
+    def test_format_amounts_nl(self):
+        rv = format_amounts([Decimal('1.23'), Decimal('0'), Decimal('1.015')], locale='nl_NL')
+        self.assertEquals(rv, ['1,23', '0,00', '1,02'])
+
+    def test_format_amounts_nl_minor_units(self):
+        rv = format_amounts([123, 0, 5, 100000, -5], locale='nl_NL', minor_units=True)
+        self.assertEquals(rv, ['1,23', '0,00', '0,05', '1000,00', '-0,05'])
+
+    def test_format_amounts_fr(self):
+        with self.assertRaises(NotImplementedError):
+            format_amounts([Decimal('1.23')], locale='fr_FR')
+
+    def test_to_minor_units(self):
+        self.assertEquals(to_minor_units(Decimal('1.23')), 123)
+        self.assertEquals(to_minor_units(Decimal('-1.23')), -123)
+        self.assertEquals(to_minor_units(Decimal('12')), 1200)
+        self.assertEquals(to_minor_units(Decimal('1E+2')), 10000)
+        self.assertEquals(to_minor_units(Decimal('0.0001')), 0)
+
+    def test_to_minor_units_half_even(self):
+        self.assertEquals(to_minor_units(Decimal('1.005')), 100)
+        self.assertEquals(to_minor_units(Decimal('1.015')), 102)
+        self.assertEquals(to_minor_units(Decimal('1.0151')), 102)
+        self.assertEquals(to_minor_units(Decimal('-1.015')), -102)
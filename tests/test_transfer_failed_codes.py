@@ -71,3 +71,8 @@ class TransferFailedTests(TestCase):
 
         rv = self.any.code_is_valid('AC00')
         self.assertEquals(rv, False)
+
+    def test_any_codes_merged(self):
+        self.assertEquals(
+            len(self.any.codes),
+            len(TransferFailedSEPA.codes) + len(TransferFailedMisc.codes))
@@ -1,7 +1,9 @@
 from collections import OrderedDict
 from datetime import datetime
 from decimal import Decimal
+from io import BytesIO
 from unittest import TestCase
+import gzip
 import os
 
 from libmt94x.document import Mt940Document
@@ -36,7 +38,7 @@ class Mt94xWriterIBPStructuredTests(TestCase):
         self.writer = Mt94xWriter(self.serializer)
 
 
-    def test_doc_ibp_structured_spec(self):
+    def get_document(self):
         # Create the entries first
 
         line1 = StatementLine(
@@ -175,12 +177,140 @@ class Mt94xWriterIBPStructuredTests(TestCase):
             ),
         )
 
-        bytes = self.writer.write_document_ibp(doc)
+        return doc
 
+    def get_expected(self):
         # Load spec file
         fp_spec = os.path.join(
             os.path.dirname(__file__), 'examples', 'ibp-structured-ing-provided-example-edited.txt')
         with open(fp_spec, 'rb+') as f:
             expected = f.read()
 
-        self.assertEquals(bytes, expected)
+        return expected
+
+    def test_doc_ibp_structured_spec(self):
+        doc = self.get_document()
+
+        bytes = self.writer.write_document_ibp(doc)
+
+        self.assertEquals(bytes, self.get_expected())
+
+    def test_doc_ibp_structured_spec_iter(self):
+        doc = self.get_document()
+
+        records = list(self.writer.iter_document_ibp(doc))
+
+        # Every record is a separate bytestring
+        self.assertTrue(len(records) > 1)
+        self.assertEquals(b''.join(records), self.get_expected())
+
+    def test_doc_ibp_structured_spec_write_to(self):
+        doc = self.get_document()
+
+        fp = BytesIO()
+        self.writer.write_document_ibp_to(doc, fp)
+
+        self.assertEquals(fp.getvalue(), self.get_expected())
+
+    def test_doc_ibp_structured_spec_write_to_blocks(self):
+        doc = self.get_document()
+
+        # Every record ends up in a block of its own
+        self.writer.output_block_size = 1
+
+        fp = BytesIO()
+        self.writer.write_document_ibp_to(doc, fp)
+
+        self.assertEquals(fp.getvalue(), self.get_expected())
+
+    def test_doc_ibp_structured_spec_write_to_kept_blocks(self):
+        doc = self.get_document()
+        self.writer.output_block_size = 100
+
+        # A sink that keeps the objects it is given
+        class Sink(object):
+            def __init__(self):
+                self.blocks = []
+
+            def write(self, block):
+                self.blocks.append(block)
+
+        sink = Sink()
+        self.writer.write_document_ibp_to(doc, sink)
+
+        self.assertTrue(len(sink.blocks) > 1)
+        self.assertTrue(all(type(block) is bytes for block in sink.blocks))
+        self.assertEquals(b''.join(sink.blocks), self.get_expected())
+
+    def test_doc_ibp_structured_spec_write_to_gzip(self):
+        doc = self.get_document()
+        self.writer.output_block_size = 100
+
+        fp = BytesIO()
+        with gzip.GzipFile(fileobj=fp, mode='wb') as f:
+            self.writer.write_document_ibp_to(doc, f)
+
+        with gzip.GzipFile(fileobj=BytesIO(fp.getvalue()), mode='rb') as f:
+            self.assertEquals(f.read(), self.get_expected())
+
+    def test_doc_ibp_structured_spec_write_to_error(self):
+        doc = self.get_document()
+        doc.closing_balance = None
+
+        fp = BytesIO()
+        with self.assertRaises(AttributeError):
+            self.writer.write_document_ibp_to(doc, fp)
+
+        # The records before the error were written
+        expected = self.get_expected()
+        self.assertEquals(fp.getvalue(), expected[:expected.index(b':62F:')])
+
+    def test_doc_ibp_structured_spec_write_into(self):
+        doc = self.get_document()
+
+        output = bytearray(b'>')
+        view = self.writer.write_document_ibp_into(doc, output)
+
+        self.assertEquals(view.tobytes(), self.get_expected())
+        self.assertEquals(output, b'>' + self.get_expected())
+
+        # The serializer returns records again
+        self.assertEquals(self.writer.write_document_ibp(doc), self.get_expected())
+
+    def test_doc_ibp_structured_spec_write_into_error(self):
+        doc = self.get_document()
+        doc.closing_balance = None
+
+        output = bytearray(b'>')
+        with self.assertRaises(AttributeError):
+            self.writer.write_document_ibp_into(doc, output)
+
+        self.assertEquals(output, b'>')
+
+    def test_doc_ibp_structured_spec_blocks(self):
+        doc = self.get_document()
+
+        blocks = list(self.writer.iter_document_ibp_blocks(doc, block_size=100))
+
+        self.assertTrue(len(blocks) > 1)
+        self.assertTrue(all(len(block) >= 100 for block in blocks[:-1]))
+        self.assertEquals(b''.join(blocks), self.get_expected())
+
+    def test_doc_ibp_structured_spec_blocks_interleaved(self):
+        doc = self.get_document()
+
+        # Two documents written block by block at the same time, with the
+        # same writer
+        first = self.writer.iter_document_ibp_blocks(doc, block_size=100)
+        second = self.writer.iter_document_ibp_blocks(doc, block_size=100)
+
+        first_blocks, second_blocks = [], []
+        for first_block, second_block in zip(first, second):
+            first_blocks.append(first_block)
+            second_blocks.append(second_block)
+
+            # The writer can be used in between blocks
+            self.assertEquals(self.writer.write_epilog_ibp(), b'-XXX')
+
+        self.assertEquals(b''.join(first_blocks), self.get_expected())
+        self.assertEquals(b''.join(second_blocks), self.get_expected())
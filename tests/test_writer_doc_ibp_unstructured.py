@@ -27,7 +27,7 @@ class Mt94xWriterIBPUnstructuredTests(TestCase):
         self.writer = Mt94xWriter(self.serializer)
 
 
-    def test_doc_ibp_unstructured_spec(self):
+    def get_document(self):
         # Create the entries first
 
         line1 = StatementLine(
@@ -170,12 +170,41 @@ class Mt94xWriterIBPUnstructuredTests(TestCase):
             ),
         )
 
-        bytes = self.writer.write_document_ibp(doc)
+        return doc
 
+    def get_expected(self):
         # Load spec file
         fp_spec = os.path.join(
             os.path.dirname(__file__), 'examples', 'ibp-unstructured-ing-provided-example.txt')
         with open(fp_spec, 'rb+') as f:
             expected = f.read()
 
-        self.assertEquals(bytes, expected)
+        return expected
+
+    def test_doc_ibp_unstructured_spec(self):
+        doc = self.get_document()
+
+        bytes = self.writer.write_document_ibp(doc)
+
+        self.assertEquals(bytes, self.get_expected())
+
+    def test_doc_ibp_unstructured_spec_write_into(self):
+        doc = self.get_document()
+
+        output = bytearray(b'>')
+        view = self.writer.write_document_ibp_into(doc, output)
+
+        self.assertEquals(view.tobytes(), self.get_expected())
+        self.assertEquals(output, b'>' + self.get_expected())
+
+        # The serializer returns records again
+        self.assertEquals(self.writer.write_document_ibp(doc), self.get_expected())
+
+    def test_doc_ibp_unstructured_spec_blocks(self):
+        doc = self.get_document()
+
+        blocks = list(self.writer.iter_document_ibp_blocks(doc, block_size=100))
+
+        self.assertTrue(len(blocks) > 1)
+        self.assertTrue(all(len(block) >= 100 for block in blocks[:-1]))
+        self.assertEquals(b''.join(blocks), self.get_expected())
@@ -1,6 +1,8 @@
 from collections import OrderedDict
 from datetime import datetime
 from decimal import Decimal
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
 from unittest import TestCase
 import os
 
@@ -25,6 +27,8 @@ from libmt94x.info_acct_owner_subfields import ReturnReason
 from libmt94x.remittance_info import DutchStructuredRemittanceInfo
 from libmt94x.remittance_info import UnstructuredRemittanceInfo
 from libmt94x.serializer import Mt94xSerializer
+from libmt94x.serializer import TrustedMt94xSerializer
+from libmt94x.stats import WriterStats
 from libmt94x.writer import Mt94xWriter
 
 
@@ -34,7 +38,7 @@ class Mt94xWriterMINGTests(TestCase):
         self.writer = Mt94xWriter(self.serializer)
 
 
-    def test_doc_ming_spec(self):
+    def get_document(self):
         # Create the entries first
 
         line1 = StatementLine(
@@ -295,12 +299,133 @@ class Mt94xWriterMINGTests(TestCase):
             ),
         )
 
-        bytes = self.writer.write_document_ming(doc)
+        return doc
 
+    def get_expected(self):
         # Load spec file
         fp_spec = os.path.join(
             os.path.dirname(__file__), 'examples', 'ming-from-spec.txt')
         with open(fp_spec, 'rb+') as f:
             expected = f.read()
 
-        self.assertEquals(bytes, expected)
+        return expected
+
+    def test_doc_ming_spec(self):
+        doc = self.get_document()
+
+        bytes = self.writer.write_document_ming(doc)
+
+        self.assertEquals(bytes, self.get_expected())
+
+    def test_doc_ming_spec_iter(self):
+        doc = self.get_document()
+
+        records = list(self.writer.iter_document_ming(doc))
+
+        # Every record is a separate bytestring
+        self.assertTrue(len(records) > 1)
+        self.assertEquals(b''.join(records), self.get_expected())
+
+    def test_doc_ming_spec_write_to(self):
+        doc = self.get_document()
+
+        fp = BytesIO()
+        written = self.writer.write_document_ming_to(doc, fp)
+
+        self.assertEquals(fp.getvalue(), self.get_expected())
+        self.assertEquals(written, len(self.get_expected()))
+
+    def test_doc_ming_spec_write_into(self):
+        doc = self.get_document()
+
+        output = bytearray(b'>')
+        view = self.writer.write_document_ming_into(doc, output)
+
+        self.assertEquals(view.tobytes(), self.get_expected())
+        self.assertEquals(output, b'>' + self.get_expected())
+
+        # The serializer returns records again
+        self.assertEquals(self.writer.write_document_ming(doc), self.get_expected())
+
+    def test_doc_ming_spec_blocks(self):
+        doc = self.get_document()
+
+        blocks = list(self.writer.iter_document_ming_blocks(doc, block_size=100))
+
+        self.assertTrue(len(blocks) > 1)
+        self.assertTrue(all(len(block) >= 100 for block in blocks[:-1]))
+        self.assertEquals(b''.join(blocks), self.get_expected())
+
+    def test_doc_ming_spec_trusted_serializer(self):
+        doc = self.get_document()
+
+        writer = Mt94xWriter(TrustedMt94xSerializer())
+        bytes = writer.write_document_ming(doc)
+
+        self.assertEquals(bytes, self.get_expected())
+
+    def test_doc_ming_spec_threads(self):
+        doc = self.get_document()
+
+        # A single writer is shared by all the threads, which interleave
+        # their records
+        pool = ThreadPool(8)
+        try:
+            results = pool.map(lambda _: self.writer.write_document_ming(doc), range(200))
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self.assertEquals(results, [self.get_expected()] * 200)
+
+        # The other threads wrote with their own serializers
+        self.assertIs(self.writer.serializer, self.serializer)
+
+    def test_doc_ming_spec_stats(self):
+        doc = self.get_document()
+
+        stats = WriterStats()
+        writer = self.writer.__class__(Mt94xSerializer(), stats=stats)
+        bytes = writer.write_document_ming(doc)
+
+        self.assertEquals(bytes, self.get_expected())
+
+        entries = list(doc.iter_entries())
+        infos = [info for _, entry_infos in entries for info in entry_infos]
+        self.assertEquals(stats.calls['write_document_ming'], 1)
+        self.assertEquals(stats.bytes['write_document_ming'], len(bytes))
+        self.assertEquals(stats.calls['write_statement_line_ming'], len(entries))
+        self.assertEquals(stats.calls['write_information_to_account_owner_ming'], len(infos))
+        self.assertEquals(stats.calls['write_epilog_ming'], 1)
+        self.assertEquals(stats.bytes['write_epilog_ming'], 2)
+
+        # Every code word is counted under its class
+        references = [info.get_code_word_by_cls(EndToEndReference).end_to_end_reference
+                      for info in infos if info.get_code_word_by_cls(EndToEndReference)]
+        self.assertEquals(stats.calls['EndToEndReference'], len(references))
+        self.assertEquals(stats.bytes['EndToEndReference'],
+                          sum(len(b'/EREF/%s/' % reference) for reference in references))
+
+        self.assertEquals([row[0] for row in stats.get_rows()][0], 'write_document_ming')
+
+    def test_doc_ming_spec_stats_write_to(self):
+        doc = self.get_document()
+
+        stats = WriterStats()
+        writer = self.writer.__class__(Mt94xSerializer(), stats=stats)
+        writer.output_block_size = 100
+
+        fp = BytesIO()
+        writer.write_document_ming_to(doc, fp)
+
+        # The records are written into the output of the serializer rather
+        # than returned, and still counted
+        expected = self.get_expected()
+        self.assertEquals(fp.getvalue(), expected)
+        self.assertEquals(stats.bytes['write_document_ming_to'], len(expected))
+        self.assertEquals(stats.bytes['write_epilog_ming'], 2)
+        self.assertEquals(stats.bytes['write_closing_balance'], len(b':62F:C140220EUR564,35\r\n'))
+
+    def test_doc_ming_spec_no_stats(self):
+        # The methods are only wrapped when stats are collected
+        self.assertFalse('write_statement_line_ming' in vars(self.writer))
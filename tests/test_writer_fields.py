@@ -163,6 +163,38 @@ class Mt94xWriterTests(TestCase):
         )
         self.assertEquals(bytes, expected)
 
+    def test_information_to_account_owner_ibp_unstructured_full_lines(self):
+        # The free form text fills two lines exactly
+        info = InformationToAccountOwner(free_form_text=b'x' * 130)
+
+        bytes = self.writer.write_information_to_account_owner_ibp(info)
+        expected = b':86:' + b'x' * 65 + b'\r\n' + b'x' * 65 + b'\r\n'
+        self.assertEquals(bytes, expected)
+
+    def test_information_to_account_owner_ibp_unstructured_no_empty_line(self):
+        # The text and the newline fill two lines exactly, which used to
+        # produce an empty line
+        info = InformationToAccountOwner(free_form_text=b'x' * 128)
+
+        bytes = self.writer.write_information_to_account_owner_ibp(info)
+        expected = b':86:' + b'x' * 65 + b'\r\n' + b'x' * 63 + b'\r\n'
+        self.assertEquals(bytes, expected)
+
+    def test_information_to_account_owner_ibp_unstructured_no_broken_newline(self):
+        # The newline straddles the end of the line, which used to break the
+        # newline itself
+        info = InformationToAccountOwner(free_form_text=b'x' * 129)
+
+        bytes = self.writer.write_information_to_account_owner_ibp(info)
+        expected = b':86:' + b'x' * 65 + b'\r\n' + b'x' * 64 + b'\r\n'
+        self.assertEquals(bytes, expected)
+
+    def test_information_to_account_owner_ibp_too_long(self):
+        info = InformationToAccountOwner(free_form_text=b'x' * 389)
+
+        with self.assertRaises(ValueError):
+            self.writer.write_information_to_account_owner_ibp(info)
+
     def test_information_to_account_owner_ming(self):
         info = InformationToAccountOwner(
             code_words=[
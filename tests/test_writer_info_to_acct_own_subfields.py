@@ -9,6 +9,7 @@ from libmt94x.info_acct_owner_subfields import CounterPartyIdentification
 from libmt94x.info_acct_owner_subfields import CreditorID
 from libmt94x.info_acct_owner_subfields import EndToEndReference
 from libmt94x.info_acct_owner_subfields import ExchangeRate
+from libmt94x.info_acct_owner_subfields import InfoToAcccountOwnerSubFieldOrder
 from libmt94x.info_acct_owner_subfields import InstructionID
 from libmt94x.info_acct_owner_subfields import MandateReference
 from libmt94x.info_acct_owner_subfields import OrderingParty
@@ -432,3 +433,12 @@ class Mt94xWriterInfoToAcctOwnerSubfieldsTests(TestCase):
         bytes = self.serializer.finish()
 
         self.assertEquals(bytes, b'/ULTD/T-Mobile Netherlands BV//')
+
+    # Layout tests
+
+    def test_all_code_words_declare_layout(self):
+        for cls in InfoToAcccountOwnerSubFieldOrder.get_field_classes():
+            self.assertTrue(cls.tag)
+            self.assertTrue(cls.items)
+            self.assertEquals(
+                InfoToAcccountOwnerSubFieldOrder.get_field_class_by_tag(cls.tag), cls)